@@ -0,0 +1,4 @@
+from .snapshot import compile_snapshot
+
+if __name__ == '__main__':
+    compile_snapshot()
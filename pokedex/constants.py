@@ -1,4 +1,20 @@
+import os
 from pathlib import Path
 
 POKEDEX_ROOT_PATH = Path(__file__).parent
 XDG_RAWDATA_HOME = f'{POKEDEX_ROOT_PATH}/rawdata'
+# Compiled by `python -m pokedex`, see `snapshot.py`.
+SNAPSHOT_PATH = f'{XDG_RAWDATA_HOME}/pokedex.snapshot'
+
+# Keep record tables in the memory-mapped snapshot and decode records on first use.
+# Best paired with a bounded model cache, since materialized models are what stays resident.
+LAZY_RECORDS = os.getenv('POKEDEX_LAZY_RECORDS', '').lower() in {'1', 'true', 'yes'}
+
+# Bound for the interned model registry, unbounded when unset (or 0).
+MODEL_CACHE_MAXSIZE = int(os.getenv('POKEDEX_MODEL_CACHE_MAXSIZE', '0')) or None
+# Eviction policy used when the registry is bounded: `lru` or `lfu`.
+MODEL_CACHE_POLICY = os.getenv('POKEDEX_MODEL_CACHE_POLICY', 'lru')
+
+# Defaults for fuzzy name suggestions (see `search.SearchIndex.search`).
+SEARCH_RESULT_LIMIT = 3
+SEARCH_SCORE_CUTOFF = 0.5
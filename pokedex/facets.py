@@ -0,0 +1,75 @@
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional
+
+from .models import utils
+
+Facet = str | Enum
+
+
+def _key(facet: str, value: Facet) -> str:
+    return f'{facet}:{value.value if isinstance(value, Enum) else value}'
+
+
+class FacetIndex:
+    """
+    Species membership bitmaps, one per region, type and growth rate plus the
+    legendary and mythical flags. Bit `n` of a bitmap is set when the species
+    with id `n` belongs to it, so combining filters is a handful of integer ANDs.
+    """
+
+    __slots__ = ('bitmaps', 'universe')
+
+    def __init__(self, bitmaps: Mapping[str, int]) -> None:
+        self.bitmaps: Dict[str, int] = dict(bitmaps)
+        self.universe: int = self.bitmaps.get('all', 0)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'FacetIndex':
+        bitmaps: Dict[str, int] = {}
+
+        def add(key: str, bit: int) -> None:
+            bitmaps[key] = bitmaps.get(key, 0) | bit
+
+        for record in records:
+            bit = 1 << record['id']
+            add('all', bit)
+            for region in record['regions']:
+                add(_key('region', region), bit)
+            for pokemon_type in record['types']:
+                add(_key('type', pokemon_type), bit)
+            add(_key('growth_rate', utils.get_growth_rate(record['growth_rate'])), bit)
+            if record['is_legendary']:
+                add('legendary', bit)
+            if record['is_mythical']:
+                add('mythical', bit)
+        return cls(bitmaps)
+
+    def _flag(self, bitmap: int, name: str, wanted: Optional[bool]) -> int:
+        if wanted is None:
+            return bitmap
+        flag = self.bitmaps.get(name, 0)
+        return bitmap & flag if wanted else bitmap & ~flag
+
+    def query(
+        self,
+        region: Optional[Facet] = None,
+        type: Optional[Facet] = None,
+        growth_rate: Optional[Facet] = None,
+        legendary: Optional[bool] = None,
+        mythical: Optional[bool] = None
+    ) -> int:
+        """Returns the bitmap of species matching every given filter; omitted filters match all."""
+        bitmap = self.universe
+        for facet, value in (('region', region), ('type', type), ('growth_rate', growth_rate)):
+            if value is not None:
+                bitmap &= self.bitmaps.get(_key(facet, value), 0)
+        bitmap = self._flag(bitmap, 'legendary', legendary)
+        return self._flag(bitmap, 'mythical', mythical)
+
+    @staticmethod
+    def ids(bitmap: int) -> Iterator[int]:
+        """Yields the ids set in `bitmap`, ascending."""
+        while bitmap:
+            lowest = bitmap & -bitmap
+            yield lowest.bit_length() - 1
+            bitmap ^= lowest
@@ -1,10 +1,11 @@
+from types import MappingProxyType
 from typing import Optional, List, Dict, Any
 
-from .resource import Resource
+from .resource import Immutable, Resource
 from . import utils
 
 
-class PokemonBaseStats:
+class PokemonBaseStats(Immutable):
     __slots__ = ("health_points", "attack", "defense", "special_attack", "special_defense", "speed")
 
     def __init__(
@@ -27,7 +28,7 @@ class PokemonBaseStats:
         return f"{self.__class__.__name__}({', '.join(f'{stat}={getattr(self, stat)!r}' for stat in self.__slots__)})"
 
 
-class PokemonSprites:
+class PokemonSprites(Immutable):
     __slots__ = ("normal", "shiny")
 
     def __init__(self, normal: str, shiny: str):
@@ -61,13 +62,13 @@ class PokemonLearnableMovesByMethod(Resource):
         return f"{self.__class__.__name__}({', '.join(f'{stat}={getattr(self, stat)!r}' for stat in self.__slots__)})"
 
 
-class PokemonLearnableMoves:
+class PokemonLearnableMoves(Immutable):
     __slots__ = ("level_up", "machine", "egg")
 
     def __init__(self, level_up: Optional[List[Dict[str, Any]]] = None, machine: Optional[List[Dict[str, Any]]] = None, egg: Optional[List[Dict[str, Any]]] = None):
-        self.level_up = [PokemonLearnableMovesByMethod(**move) for move in (level_up or [])]
-        self.machine = [PokemonLearnableMovesByMethod(**move) for move in (machine or [])]
-        self.egg = [PokemonLearnableMovesByMethod(**move) for move in (egg or [])]
+        self.level_up = tuple(PokemonLearnableMovesByMethod(**move) for move in (level_up or []))
+        self.machine = tuple(PokemonLearnableMovesByMethod(**move) for move in (machine or []))
+        self.egg = tuple(PokemonLearnableMovesByMethod(**move) for move in (egg or []))
 
     def __repr__(self):
         return f"{self.__class__.__name__}({', '.join(f'{stat}={getattr(self, stat)!r}' for stat in self.__slots__)})"
@@ -108,15 +109,14 @@ class Pokemon(Resource):
         self.growth_rate = utils.get_growth_rate(growth_rate)
         self.evolves_from = evolves_from
         self.evolves_to = PokemonEvolveTo(**evolves_to) if evolves_to else None
-        self.types = [utils.get_type(type) for type in types]
+        self.types = tuple(utils.get_type(type) for type in types)
         self.sprites = PokemonSprites(**sprites)
         self.base_stats = PokemonBaseStats(**base_stats)
-        self.ev_yields = ev_yields
-        self.regions = [utils.get_region(region) for region in regions]
- 
-        learnable_moves.pop("tutor", None)  
-
-        self.learnable_moves = PokemonLearnableMoves(**learnable_moves)  
+        self.ev_yields = MappingProxyType(dict(ev_yields))
+        self.regions = tuple(utils.get_region(region) for region in regions)
+        self.learnable_moves = PokemonLearnableMoves(
+            **{method: moves for method, moves in learnable_moves.items() if method != "tutor"}
+        )
 
     def __repr__(self):
         return f"{self.__class__.__name__}({', '.join(f'{stat}={getattr(self, stat)!r}' for stat in self.__slots__)})"
@@ -4,9 +4,31 @@ from dataclasses import dataclass
 class MetaResource(type):
     def __new__(cls, name, bases, clsdict):
         clsobj = super().__new__(cls, name, bases, clsdict)
-        return dataclass(clsobj, init=False)
+        return dataclass(clsobj, init=False, unsafe_hash=True)
 
-class Resource(metaclass=MetaResource):
+class Immutable:
+    """Makes the `__slots__` of a model write-once, so instances can be shared and hashed."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: object) -> None:
+        if hasattr(self, name):
+            raise AttributeError(f'{self.__class__.__name__} is immutable, cannot reassign {name!r}')
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{self.__class__.__name__} is immutable, cannot delete {name!r}')
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, self.__class__)
+            and all(getattr(other, slot) == getattr(self, slot) for slot in self.__slots__)
+        )
+
+    def __hash__(self) -> int:
+        return hash(tuple(getattr(self, slot) for slot in self.__slots__))
+
+class Resource(Immutable, metaclass=MetaResource):
     """A resource with a name and id"""
 
     id: int
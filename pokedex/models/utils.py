@@ -29,7 +29,7 @@ def get_growth_rate(growth_rate: str) -> enums.GrowthRate:
   elif growth_rate == 'medium':
     _growth_rate = enums.GrowthRate.MEDIUM
   elif growth_rate == 'slow-then-very-fast':
-    _growth_rate = enums.GrowthRate.MEDIUN_FAST
+    _growth_rate = enums.GrowthRate.MEDIUM_FAST
   elif growth_rate == 'fast':
     _growth_rate = enums.GrowthRate.FAST
   else:
@@ -1,20 +1,89 @@
 import os
 import json
-import difflib
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Mapping, MutableMapping, Tuple
 
-from cachetools import cached, LRUCache
+from cachetools import LFUCache, LRUCache
+from loguru import logger
 
-from . import constants, enums
+from . import constants, enums, snapshot
 from .errors import PokedexError
+from .facets import Facet, FacetIndex
 from .models import Pokemon, Move
+from .search import SearchIndex
+from .table import StatsTable
+from .utils import normalize_name
+
+class ModelRegistry:
+    """
+    Interns model instances so every record is materialized at most once and then shared.
+
+    Unbounded by default; with `maxsize` set, the least recently (`lru`) or least
+    frequently (`lfu`) used instances are evicted and rebuilt on their next lookup.
+    """
+
+    __slots__ = ('_cache', 'hits', 'misses')
+
+    def __init__(self, maxsize: Optional[int] = None, policy: str = 'lru') -> None:
+        if maxsize is None:
+            self._cache: MutableMapping[Tuple[type, int], Pokemon | Move] = {}
+        elif policy == 'lru':
+            self._cache = LRUCache(maxsize=maxsize)
+        elif policy == 'lfu':
+            self._cache = LFUCache(maxsize=maxsize)
+        else:
+            raise ValueError(f'Unsupported model cache policy: {policy}')
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, model_class: type, record_id: int, records: Mapping[int, Dict[str, Any]]) -> Pokemon | Move:
+        """Returns the shared instance for `record_id`, building it from `records` on a miss."""
+        key = (model_class, record_id)
+        try:
+            instance = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            instance = self._cache[key] = model_class(**records[record_id])
+            return instance
+        self.hits += 1
+        return instance
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'size': len(self._cache),
+            'maxsize': getattr(self._cache, 'maxsize', None),
+        }
+
 
 class PokedexBase:
 
-    __slots__ = ('data', '_tried')
+    __slots__ = ('data', 'registry', 'lazy', 'version', '_tried', '_snapshot', '_ids', '_names', '_search', '_facets', '_table')
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache_maxsize: Optional[int] = constants.MODEL_CACHE_MAXSIZE,
+        cache_policy: str = constants.MODEL_CACHE_POLICY,
+        lazy: bool = constants.LAZY_RECORDS
+    ) -> None:
+        # Raw data files; in lazy mode the record tables are left in the snapshot instead.
         self.data: Dict[str, List[Dict[str, Any]]] = {}
+        self.registry: ModelRegistry = ModelRegistry(cache_maxsize, cache_policy)
+        self.lazy: bool = lazy
+        # Bumped on every (re)load, so dependents can tell their derived data is stale.
+        self.version: int = 0
+        self._snapshot: Optional[snapshot.Snapshot] = None
+        # Indexes rebuilt on every `_initialize`: id -> record and normalized name -> id.
+        self._ids: Dict[str, Mapping[int, Dict[str, Any]]] = {}
+        self._names: Dict[str, Dict[str, int]] = {}
+        self._search: Dict[str, SearchIndex] = {}
+        self._facets: FacetIndex = FacetIndex({})
+        self._table: StatsTable = StatsTable.from_records(())
         self._tried: int = 0
         self._initialize()
 
@@ -24,6 +93,27 @@ class PokedexBase:
             raise PokedexError('Failed to load data files after multiple attempts.')
 
         self._tried += 1
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+        compiled = snapshot.open_snapshot()
+        if compiled is None:
+            if self.lazy:
+                logger.warning('No usable pokedex snapshot, loading the JSON rawdata eagerly instead')
+            self._load_json()
+        elif self.lazy:
+            self._snapshot = compiled
+            self._load_lazy(compiled)
+        else:
+            with compiled:
+                self.data.update(compiled.load())
+
+        self._build_indexes()
+        self.registry.clear()
+        self.version += 1
+
+    def _load_json(self) -> None:
         for filename in os.listdir(constants.XDG_RAWDATA_HOME):
             if filename.endswith('.json'):
                 filepath = os.path.join(constants.XDG_RAWDATA_HOME, filename)
@@ -34,37 +124,136 @@ class PokedexBase:
                 except (FileNotFoundError, IOError, OSError) as e:
                     logger.exception(f'Error opening or reading pokedex rawdata file: {filepath}')
 
-    #  @cached(cache=LRUCache(maxsize=100))
+    def _load_lazy(self, compiled: snapshot.Snapshot) -> None:
+        for name, entry in compiled.directory.items():
+            if 'blob' in entry:
+                self.data[name] = compiled.blob(*entry['blob'])
+            else:
+                self.data.pop(name, None)
+                self._ids[name] = compiled.table(name)
+
+    def _build_indexes(self) -> None:
+        """Builds the id and normalized name indexes, the fuzzy search index, and the pokemon facets and stats table."""
+        for data_type in enums.DataType:
+            records = self.data.get(data_type.value)
+            if records is not None:
+                self._ids[data_type.value] = {record['id']: record for record in records}
+                names = ((record['name'], record['id']) for record in records)
+                if data_type is enums.DataType.POKEMON:
+                    self._facets = FacetIndex.from_records(records)
+                    self._table = StatsTable.from_records(records)
+            elif isinstance(table := self._ids.get(data_type.value), snapshot.SnapshotTable):
+                names = table.name_items()
+                if data_type is enums.DataType.POKEMON:
+                    self._facets = FacetIndex(table.facets or {})
+                    self._table = StatsTable.from_bytes(table.columns or {})
+            else:
+                continue
+            self._names[data_type.value] = {normalize_name(name): record_id for name, record_id in names}
+            self._search[data_type.value] = SearchIndex(self._names[data_type.value])
+
+    def _index(self, data_type: enums.DataType) -> Tuple[Mapping[int, Dict[str, Any]], Dict[str, int]]:
+        try:
+            return self._ids[data_type.value], self._names[data_type.value]
+        except KeyError:
+            self._initialize()
+            return self._index(data_type)
+
     def _filter(self, region: str | enums.Region) -> Optional[List[Pokemon]]:
-      try:
-          results: List[Pokemon] = []
-          if isinstance(region, enums.Region):
-              region = region.value
-          for pokemon in self.data['pokemon']:
-              if region in pokemon['region']:
-                poke = self.get_pokemon(pokemon['id'])
-                if poke:
-                  results.append(poke)
-          return results if results else None
-      except KeyError:
-          return None
+        return self.query_pokemon(region=region) or None
+
+    def query_pokemon_ids(
+        self,
+        region: Optional[Facet] = None,
+        type: Optional[Facet] = None,
+        growth_rate: Optional[Facet] = None,
+        legendary: Optional[bool] = None,
+        mythical: Optional[bool] = None
+    ) -> List[int]:
+        """Returns the ids of the species matching every given filter, without materializing them."""
+        self._index(enums.DataType.POKEMON)
+        bitmap = self._facets.query(region, type, growth_rate, legendary, mythical)
+        return list(FacetIndex.ids(bitmap))
+
+    def query_pokemon(
+        self,
+        region: Optional[Facet] = None,
+        type: Optional[Facet] = None,
+        growth_rate: Optional[Facet] = None,
+        legendary: Optional[bool] = None,
+        mythical: Optional[bool] = None
+    ) -> List[Pokemon]:
+        ids, _ = self._index(enums.DataType.POKEMON)
+        return [
+            self.registry.get(Pokemon, pokemon_id, ids)
+            for pokemon_id in self.query_pokemon_ids(region, type, growth_rate, legendary, mythical)
+        ]
+
+    @property
+    def stats_table(self) -> StatsTable:
+        self._index(enums.DataType.POKEMON)
+        return self._table
+
+    def top_pokemon(
+        self,
+        column: str,
+        limit: int = 10,
+        ascending: bool = False,
+        region: Optional[Facet] = None,
+        type: Optional[Facet] = None,
+        growth_rate: Optional[Facet] = None,
+        legendary: Optional[bool] = None,
+        mythical: Optional[bool] = None
+    ) -> List[Pokemon]:
+        """Ranks the species matching the filters by a `StatsTable` column, materializing only the top `limit`."""
+        ids, _ = self._index(enums.DataType.POKEMON)
+        candidates = None
+        if any(value is not None for value in (region, type, growth_rate, legendary, mythical)):
+            candidates = self.query_pokemon_ids(region, type, growth_rate, legendary, mythical)
+        return [
+            self.registry.get(Pokemon, pokemon_id, ids)
+            for pokemon_id in self._table.top(column, limit, candidates, ascending)
+        ]
 
     #  @cached(cache=LRUCache(maxsize=100))
-    def _find_similar(self, name: str, possibilities: List[str], data_type: enums.DataType, model_class: Pokemon | Move) -> Optional[List[Pokemon | Move]]:
-        results: List[Pokemon | Move] = []
-        matches = difflib.get_close_matches(word=name, possibilities=possibilities)
-        if matches:
-            for match in matches:
-                item = self._get_item(match, data_type, model_class)
-                if item:
-                    results.append(item)
+    def _find_similar(
+        self,
+        name: str,
+        data_type: enums.DataType,
+        model_class: Pokemon | Move,
+        limit: int = constants.SEARCH_RESULT_LIMIT,
+        cutoff: float = constants.SEARCH_SCORE_CUTOFF
+    ) -> Optional[List[Pokemon | Move]]:
+        ids, names = self._index(data_type)
+        results: List[Pokemon | Move] = [
+            self.registry.get(model_class, names[match], ids)
+            for match, _ in self._search[data_type.value].search(name, limit=limit, cutoff=cutoff)
+        ]
         return results if results else None
 
+    def search_pokemon(
+        self,
+        query: str,
+        limit: int = constants.SEARCH_RESULT_LIMIT,
+        cutoff: float = constants.SEARCH_SCORE_CUTOFF
+    ) -> Optional[List[Pokemon]]:
+        return self._find_similar(query, enums.DataType.POKEMON, Pokemon, limit, cutoff)
+
+    def search_moves(
+        self,
+        query: str,
+        limit: int = constants.SEARCH_RESULT_LIMIT,
+        cutoff: float = constants.SEARCH_SCORE_CUTOFF
+    ) -> Optional[List[Move]]:
+        return self._find_similar(query, enums.DataType.MOVES, Move, limit, cutoff)
+
     def get_all_pokemon(self, data_type: enums.DataType = enums.DataType.POKEMON) -> List[Pokemon]:
-        return [self.get_pokemon(pokemon['id']) for pokemon in self.data[data_type.value]]
+        ids, _ = self._index(data_type)
+        return [self.registry.get(Pokemon, pokemon_id, ids) for pokemon_id in ids]
 
     def get_all_moves(self, data_type: enums.DataType = enums.DataType.MOVES) -> List[Move]:
-        return [self.get_move(move['id']) for move in self.data[data_type.value]]
+        ids, _ = self._index(data_type)
+        return [self.registry.get(Move, move_id, ids) for move_id in ids]
 
     def get_pokemon(self, id_or_name: int | str) -> Optional[Pokemon | List[Pokemon]]:
         return self._get_item(id_or_name, enums.DataType.POKEMON, Pokemon)
@@ -74,34 +263,23 @@ class PokedexBase:
 
     #  @cached(cache=LRUCache(maxsize=100))
     def _get_item(self, id_or_name: int | str, data_type: enums.DataType, model_class: Pokemon | Move) -> Optional[Pokemon | Move | List[Pokemon | Move]]:
-        try:
-            data: List[Dict[str, Any]] = self.data[data_type.value]
-        except KeyError:
-            self._initialize()
-            return self._get_item(id_or_name, data_type, model_class)
+        ids, names = self._index(data_type)
 
         if isinstance(id_or_name, int):
-            for item in data:
-                if item['id'] == id_or_name:
-                    return model_class(**item)
+            item_id = id_or_name
         elif isinstance(id_or_name, str):
             if id_or_name.isdigit():
-                for item in data:
-                    if item['id'] == int(id_or_name):
-                        return model_class(**item)
+                item_id = int(id_or_name)
             else:
-                name = id_or_name.strip().lower().replace(' ', '-')
-                for item in data:
-                    if item['name'] == name:
-                        return model_class(**item)
-                return self._find_similar(
-                    name=name,
-                    possibilities=[
-                        item['name']
-                        for item in data
-                    ],
-                    data_type=data_type,
-                    model_class=model_class
-                )
+                name = normalize_name(id_or_name)
+                item_id = names.get(name)
+                if item_id is None:
+                    return self._find_similar(
+                        name=name,
+                        data_type=data_type,
+                        model_class=model_class
+                    )
         else:
             raise TypeError('`id_or_name` must be `int` or `str`')
+
+        return self.registry.get(model_class, item_id, ids) if item_id in ids else None
@@ -0,0 +1,70 @@
+import heapq
+from typing import Dict, Iterable, List, Tuple
+
+from .utils import normalize_name
+
+# Prefix matches ("chari" -> "charizard") score at least this much, scaled up by coverage.
+PREFIX_SCORE_FLOOR = 0.6
+
+
+def trigrams(name: str) -> frozenset[str]:
+    """Returns the padded character trigrams of an already normalized name."""
+    padded = f'  {name} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class SearchIndex:
+    """
+    Fuzzy name lookup over a fixed set of names.
+
+    Names are normalized with `normalize_name` and indexed by trigram; a query only
+    scores the names sharing at least one trigram with it (Dice coefficient), and
+    prefixes of a name are ranked as close matches as well.
+    """
+
+    __slots__ = ('_names', '_sizes', '_postings')
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self._names: List[str] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+
+        for name in dict.fromkeys(normalize_name(name) for name in names):
+            position = len(self._names)
+            grams = trigrams(name)
+            self._names.append(name)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, query: str, limit: int = 3, cutoff: float = 0.5) -> List[Tuple[str, float]]:
+        """
+        Returns up to `limit` `(name, score)` pairs scoring at least `cutoff`, best first.
+
+        Scores range from 0.0 to 1.0, where 1.0 is an exact match.
+        """
+        query = normalize_name(query)
+        if not query or limit <= 0:
+            return []
+
+        grams = trigrams(query)
+        common: Dict[int, int] = {}
+        for gram in grams:
+            for position in self._postings.get(gram, ()):
+                common[position] = common.get(position, 0) + 1
+
+        size = len(grams)
+        scored: List[Tuple[float, str]] = []
+        for position, shared in common.items():
+            name = self._names[position]
+            score = 2 * shared / (size + self._sizes[position])
+            if name.startswith(query):
+                score = max(score, PREFIX_SCORE_FLOOR + (1 - PREFIX_SCORE_FLOOR) * len(query) / len(name))
+            if score >= cutoff:
+                scored.append((score, name))
+
+        best = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], item[1]))
+        return [(name, score) for score, name in best]
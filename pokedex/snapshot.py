@@ -0,0 +1,266 @@
+"""
+Compiled binary snapshot of the pokedex rawdata.
+
+Parsing every JSON file on each process start is the slowest part of loading the
+pokedex, so the rawdata can be compiled once (`python -m pokedex`) into a
+single file that is memory-mapped and decoded with `marshal` instead.
+
+Layout, little endian:
+
+    header     magic, format version, marshal version, python version,
+               rawdata fingerprint, payload digest, directory size
+    directory  marshalled mapping of every data file to its entry
+    blobs      one marshalled blob per record (or per non-tabular data file)
+
+A table entry holds the record ids and names next to the (offset, length) of each
+record blob, so single records can be decoded without touching the others. The
+pokemon table also carries its precomputed `FacetIndex` bitmaps and `StatsTable`
+columns.
+
+The snapshot is only used while it matches the interpreter, its digest and the
+fingerprint (names, sizes and mtimes) of the JSON files it was compiled from;
+otherwise the loader falls back to the JSON rawdata.
+"""
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from collections.abc import Iterator, Mapping
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from . import constants, enums
+from .facets import FacetIndex
+from .table import StatsTable
+
+MAGIC = b'PDXS'
+FORMAT_VERSION = 3
+PYTHON_VERSION = sys.version_info.major << 8 | sys.version_info.minor
+
+HEADER = struct.Struct('<4sHHH32s32sQ')
+
+
+def fingerprint(rawdata_home: str = constants.XDG_RAWDATA_HOME) -> Optional[bytes]:
+    """Returns a digest of the JSON rawdata files' names, sizes and mtimes, or None if there are none."""
+    digest = hashlib.sha256()
+    found = False
+    if not os.path.isdir(rawdata_home):
+        return None
+    for filename in sorted(os.listdir(rawdata_home)):
+        if filename.endswith('.json'):
+            stat = os.stat(os.path.join(rawdata_home, filename))
+            digest.update(f'{filename}\0{stat.st_size}\0{stat.st_mtime_ns}\0'.encode())
+            found = True
+    return digest.digest() if found else None
+
+
+def _is_table(content: Any) -> bool:
+    return (
+        isinstance(content, list)
+        and all(isinstance(item, dict) and 'id' in item and 'name' in item for item in content)
+    )
+
+
+def _intern(value: Any, strings: Dict[str, str]) -> Any:
+    """Shares equal strings so `marshal` writes each of them once per blob."""
+    if isinstance(value, str):
+        return strings.setdefault(value, value)
+    if isinstance(value, dict):
+        return {strings.setdefault(key, key): _intern(item, strings) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_intern(item, strings) for item in value]
+    return value
+
+
+def compile_snapshot(
+    rawdata_home: str = constants.XDG_RAWDATA_HOME,
+    path: str = constants.SNAPSHOT_PATH
+) -> Path:
+    """Compiles the JSON rawdata into a snapshot at `path` and returns it."""
+    strings: Dict[str, str] = {}
+    directory: Dict[str, Dict[str, Any]] = {}
+    blobs: List[bytes] = []
+    offset = 0
+
+    def append(blob: bytes) -> Tuple[int, int]:
+        nonlocal offset
+        blobs.append(blob)
+        offset += len(blob)
+        return offset - len(blob), len(blob)
+
+    for filename in sorted(os.listdir(rawdata_home)):
+        if not filename.endswith('.json'):
+            continue
+        with open(os.path.join(rawdata_home, filename), 'r', encoding='utf8') as f:
+            content = _intern(json.load(f), strings)
+
+        if not _is_table(content):
+            directory[filename[:-5]] = {'blob': append(marshal.dumps(content))}
+            continue
+
+        offsets, lengths = array('Q'), array('Q')
+        for record in content:
+            start, length = append(marshal.dumps(record))
+            offsets.append(start)
+            lengths.append(length)
+        directory[filename[:-5]] = {
+            'ids': array('q', (record['id'] for record in content)).tobytes(),
+            'names': tuple(record['name'] for record in content),
+            'offsets': offsets.tobytes(),
+            'lengths': lengths.tobytes(),
+        }
+        if filename[:-5] == enums.DataType.POKEMON.value:
+            directory[filename[:-5]]['facets'] = FacetIndex.from_records(content).bitmaps
+            directory[filename[:-5]]['columns'] = StatsTable.from_records(content).to_bytes()
+
+    encoded_directory = marshal.dumps(directory)
+    payload_digest = hashlib.blake2b(digest_size=32)
+    payload_digest.update(encoded_directory)
+    for blob in blobs:
+        payload_digest.update(blob)
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, marshal.version, PYTHON_VERSION,
+        fingerprint(rawdata_home) or bytes(32), payload_digest.digest(), len(encoded_directory)
+    )
+
+    target = Path(path)
+    partial = target.with_name(f'{target.name}.partial')
+    with partial.open('wb') as f:
+        f.write(header)
+        f.write(encoded_directory)
+        f.writelines(blobs)
+    os.replace(partial, target)
+
+    logger.info(f'Compiled pokedex snapshot `{target}` ({target.stat().st_size} bytes)')
+    return target
+
+
+class Snapshot:
+    """A validated, memory-mapped snapshot; see `open_snapshot`."""
+
+    __slots__ = ('directory', '_file', '_mmap', '_base')
+
+    def __init__(self, file, mapped: mmap.mmap, directory: Dict[str, Dict[str, Any]], base: int) -> None:
+        self.directory = directory
+        self._file = file
+        self._mmap = mapped
+        self._base = base
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def blob(self, offset: int, length: int) -> Any:
+        start = self._base + offset
+        return marshal.loads(self._mmap[start:start + length])
+
+    def table(self, name: str) -> 'SnapshotTable':
+        return SnapshotTable(self, self.directory[name])
+
+    def load(self) -> Dict[str, Any]:
+        """Decodes every data file of the snapshot, in the shape of the JSON rawdata."""
+        data: Dict[str, Any] = {}
+        for name, entry in self.directory.items():
+            if 'blob' in entry:
+                data[name] = self.blob(*entry['blob'])
+                continue
+            offsets, lengths = array('Q'), array('Q')
+            offsets.frombytes(entry['offsets'])
+            lengths.frombytes(entry['lengths'])
+            data[name] = [self.blob(offset, length) for offset, length in zip(offsets, lengths)]
+        return data
+
+
+class SnapshotTable(Mapping):
+    """
+    Read-only id -> record mapping over one table of an open snapshot.
+
+    Only the offset table and the names are kept in memory; every lookup decodes
+    its record from the mapped file, so callers should keep what they build from it.
+    """
+
+    __slots__ = ('names', 'facets', 'columns', '_snapshot', '_ids', '_positions', '_offsets', '_lengths')
+
+    def __init__(self, snapshot: Snapshot, entry: Dict[str, Any]) -> None:
+        self._snapshot = snapshot
+        self._ids = array('q')
+        self._ids.frombytes(entry['ids'])
+        self._positions: Dict[int, int] = {record_id: position for position, record_id in enumerate(self._ids)}
+        self._offsets = array('Q')
+        self._offsets.frombytes(entry['offsets'])
+        self._lengths = array('Q')
+        self._lengths.frombytes(entry['lengths'])
+        self.names: Tuple[str, ...] = entry['names']
+        self.facets: Optional[Dict[str, int]] = entry.get('facets')
+        self.columns: Optional[Dict[str, Tuple[str, bytes]]] = entry.get('columns')
+
+    def __getitem__(self, record_id: int) -> Dict[str, Any]:
+        position = self._positions[record_id]
+        return self._snapshot.blob(self._offsets[position], self._lengths[position])
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self._positions
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def name_items(self) -> Iterator[Tuple[str, int]]:
+        """Yields `(name, id)` pairs without decoding any record."""
+        return zip(self.names, self._ids)
+
+
+def open_snapshot(
+    path: str = constants.SNAPSHOT_PATH,
+    rawdata_home: str = constants.XDG_RAWDATA_HOME
+) -> Optional[Snapshot]:
+    """Opens and validates the snapshot at `path`, or returns None when it is missing, stale or corrupt."""
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+
+    try:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        file.close()
+        logger.warning(f'Could not map pokedex snapshot `{path}`, falling back to JSON rawdata')
+        return None
+
+    reason = None
+    if len(mapped) < HEADER.size:
+        reason = 'truncated'
+    else:
+        magic, version, marshal_version, python_version, source, digest, directory_size = HEADER.unpack_from(mapped)
+        if (magic, version, marshal_version, python_version) != (MAGIC, FORMAT_VERSION, marshal.version, PYTHON_VERSION):
+            reason = 'incompatible format'
+        elif (current := fingerprint(rawdata_home)) is not None and current != source:
+            reason = 'stale'
+        else:
+            with memoryview(mapped) as view:
+                if hashlib.blake2b(view[HEADER.size:], digest_size=32).digest() != digest:
+                    reason = 'checksum mismatch'
+
+    if reason:
+        mapped.close()
+        file.close()
+        logger.warning(f'Ignoring pokedex snapshot `{path}` ({reason}), falling back to JSON rawdata')
+        return None
+
+    directory = marshal.loads(mapped[HEADER.size:HEADER.size + directory_size])
+    return Snapshot(file, mapped, directory, HEADER.size + directory_size)
@@ -0,0 +1,120 @@
+import heapq
+import operator
+from array import array
+from itertools import compress
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from . import enums
+
+STAT_COLUMNS = ('health_points', 'attack', 'defense', 'special_attack', 'special_defense', 'speed')
+COLUMNS = ('id', *STAT_COLUMNS, 'total', 'capture_rate', 'appear_rate', 'primary_type', 'secondary_type')
+
+# Type columns hold the position of the type in `enums.Type`, or NO_TYPE.
+TYPE_CODES: Dict[str, int] = {pokemon_type.value: code for code, pokemon_type in enumerate(enums.Type)}
+NO_TYPE = 0xFF
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>=': operator.ge,
+    '>': operator.gt,
+}
+
+AGGREGATES: Dict[str, Callable[[List[int]], float]] = {
+    'count': len,
+    'sum': sum,
+    'min': min,
+    'max': max,
+    'mean': lambda values: sum(values) / len(values),
+}
+
+
+def type_code(pokemon_type: str | enums.Type) -> int:
+    return TYPE_CODES[pokemon_type.value if isinstance(pokemon_type, enums.Type) else pokemon_type]
+
+
+class StatsTable:
+    """
+    Column-oriented copy of the numeric species attributes.
+
+    Every column is a typed `array` with one row per species, so filters, rankings
+    and aggregates run over machine integers instead of `Pokemon` instances. Queries
+    take and return species ids; `ids` arguments restrict a query to those species
+    (e.g. the result of a facet query) and default to the whole table.
+    """
+
+    __slots__ = ('columns', '_rows')
+
+    def __init__(self, columns: Mapping[str, array]) -> None:
+        self.columns: Dict[str, array] = dict(columns)
+        self._rows: Dict[int, int] = {species_id: row for row, species_id in enumerate(self.columns['id'])}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'StatsTable':
+        columns = {name: array('l') for name in ('id', 'total', 'capture_rate', 'appear_rate')}
+        columns.update({name: array('H') for name in STAT_COLUMNS})
+        columns.update({name: array('B') for name in ('primary_type', 'secondary_type')})
+
+        for record in records:
+            stats = record['base_stats']
+            types = [type_code(pokemon_type) for pokemon_type in record['types']] + [NO_TYPE, NO_TYPE]
+            columns['id'].append(record['id'])
+            for stat in STAT_COLUMNS:
+                columns[stat].append(stats[stat])
+            columns['total'].append(sum(stats[stat] for stat in STAT_COLUMNS))
+            columns['capture_rate'].append(record['capture_rate'])
+            columns['appear_rate'].append(record['appear_rate'])
+            columns['primary_type'].append(types[0])
+            columns['secondary_type'].append(types[1])
+        return cls(columns)
+
+    @classmethod
+    def from_bytes(cls, encoded: Mapping[str, tuple[str, bytes]]) -> 'StatsTable':
+        columns = {}
+        for name, (typecode, data) in encoded.items():
+            columns[name] = array(typecode)
+            columns[name].frombytes(data)
+        return cls(columns)
+
+    def to_bytes(self) -> Dict[str, tuple[str, bytes]]:
+        return {name: (column.typecode, column.tobytes()) for name, column in self.columns.items()}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _select(self, ids: Optional[Iterable[int]]) -> List[int]:
+        if ids is None:
+            return list(range(len(self.columns['id'])))
+        rows = self._rows
+        return [rows[species_id] for species_id in ids if species_id in rows]
+
+    def values(self, column: str, ids: Optional[Iterable[int]] = None) -> List[int]:
+        data = self.columns[column]
+        return [data[row] for row in self._select(ids)]
+
+    def where(self, column: str, op: str, value: int, ids: Optional[Iterable[int]] = None) -> List[int]:
+        """Returns the ids whose `column` compares to `value` with `op` (`<`, `<=`, `==`, `!=`, `>=`, `>`)."""
+        compare = OPERATORS[op]
+        rows = self._select(ids)
+        data, id_column = self.columns[column], self.columns['id']
+        mask = [compare(data[row], value) for row in rows]
+        return [id_column[row] for row in compress(rows, mask)]
+
+    def with_type(self, pokemon_type: str | enums.Type, ids: Optional[Iterable[int]] = None) -> List[int]:
+        code = type_code(pokemon_type)
+        rows = self._select(ids)
+        primary, secondary, id_column = self.columns['primary_type'], self.columns['secondary_type'], self.columns['id']
+        return [id_column[row] for row in rows if primary[row] == code or secondary[row] == code]
+
+    def top(self, column: str, limit: int, ids: Optional[Iterable[int]] = None, ascending: bool = False) -> List[int]:
+        """Returns the ids of the `limit` species ranked highest (or lowest) by `column`."""
+        data, id_column = self.columns[column], self.columns['id']
+        pick = heapq.nsmallest if ascending else heapq.nlargest
+        return [id_column[row] for row in pick(limit, self._select(ids), key=data.__getitem__)]
+
+    def aggregate(self, column: str, function: str, ids: Optional[Iterable[int]] = None) -> float:
+        """Applies `count`, `sum`, `min`, `max` or `mean` to `column`; returns 0 for an empty selection."""
+        values = self.values(column, ids)
+        return AGGREGATES[function](values) if values else 0
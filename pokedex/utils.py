@@ -1,3 +1,8 @@
+import random
+import re
+
+from unidecode import unidecode
+
 from . import enums
 
 MAX_IV_PER_STAT = 31
@@ -53,3 +58,20 @@ MoveDamageClassDict = {
     'physical': enums.MoveDamageClass.PHYSICAL,
     'special': enums.MoveDamageClass.SPECIAL
 }
+
+
+_NAME_PUNCTUATION = re.compile(r"[^a-z0-9\s_-]")
+
+
+def normalize_name(name: str) -> str:
+    """Normalizes a resource name to the form used by the rawdata (e.g. `Mr. Mimé` -> `mr-mime`)."""
+    name = _NAME_PUNCTUATION.sub('', unidecode(name).lower())
+    return '-'.join(name.replace('_', ' ').split())
+
+
+def random_nature() -> enums.Nature:
+    return random.choice(tuple(enums.Nature))
+
+
+def random_gender() -> enums.Gender:
+    return random.choice((enums.Gender.MALE, enums.Gender.FEMALE))
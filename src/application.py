@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
@@ -11,6 +12,8 @@ from loguru import logger
 
 from . import PROJECT_NAME, __version__
 from .config import ConfigManager
+from .database import database
+from .utils.lifecycle import run_shutdown_hooks, run_startup_hooks
 
 if TYPE_CHECKING:
     from hydrogram.types import User
@@ -46,13 +49,14 @@ class Application(Client):
         self.me: Optional[User] = None
 
     async def start(self) -> None:
+        # Connected before the client, so no update is handled without the pool.
+        await database.start()
         await super().start()
         
         from .modules.core import ModuleLoader
         loader = ModuleLoader()
-        await loader.load_all(self)
-
-        self.me = await self.get_me()
+        self.me, _ = await asyncio.gather(self.get_me(), loader.load_all(self))
+        await run_startup_hooks()
 
         logger.info(
             f'{PROJECT_NAME} {__version__} running with {self.app_version} '
@@ -60,5 +64,8 @@ class Application(Client):
         )
 
     async def stop(self) -> None:
+        # The client goes first, so no update dirties state after the hooks' final flushes.
         await super().stop()
+        await run_shutdown_hooks()
+        await database.stop()
         logger.info(f'{PROJECT_NAME} stopped.')
@@ -19,6 +19,20 @@ DEFAULT_CONFIG_TEMPLATE = {
         "LOGS_CHAT": -1002466314368,
         "BACKUP_CHAT": -1002466314368
     },
+    "database": {
+        "URI": "mongodb://localhost:27017",
+        "NAME": "gulambi",
+        "MAX_POOL_SIZE": 50,
+        "MIN_POOL_SIZE": 5,
+        "MAX_IDLE_TIME_MS": 300000,
+        "CONNECT_TIMEOUT_MS": 5000,
+        "SERVER_SELECTION_TIMEOUT_MS": 5000,
+        "SOCKET_TIMEOUT_MS": 10000,
+        "WAIT_QUEUE_TIMEOUT_MS": 2000,
+        "READ_PREFERENCE": "primaryPreferred",
+        "WRITE_CONCERN": 1,
+        "JOURNAL": True
+    },
     "general": {
         "PASTEBIN_API_DEV_KEY": "WnSTVVqe2BXmgT5c0SOwTx8c3ekhdd7E"
     }
@@ -1 +1,16 @@
+from .cache import DocumentCache, document_cache_stats
+from .counters import TrainerCounters, trainer_counters
+from .database import Database, DatabaseSettings, database
+from .models import sudoers_cache, trainer_cache
 
+__all__ = (
+  "Database",
+  "DatabaseSettings",
+  "DocumentCache",
+  "TrainerCounters",
+  "database",
+  "document_cache_stats",
+  "sudoers_cache",
+  "trainer_cache",
+  "trainer_counters"
+)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Generic, Optional, TypeVar
+
+from cachetools import TTLCache
+
+from src.utils.metrics import register_metrics
+
+if TYPE_CHECKING:
+    from beanie import Document
+
+D = TypeVar('D', bound='Document')
+
+caches: dict[str, DocumentCache[Any]] = {}
+
+# Cached in place of a document that doesn't exist, so repeated lookups of unknown users stay off the database.
+_MISSING = object()
+# Result handed to the callers waiting on a load whose caller was cancelled: one of them loads again.
+_RETRY = object()
+
+
+class DocumentCache(Generic[D]):
+    """
+    Read-through cache of documents by a unique key, bounded by size (LRU) and age (TTL).
+
+    Concurrent misses for one key share a single query. Documents invalidate
+    their entry from a beanie `after_event` hook when saved through the ODM;
+    code writing to the collection directly must call `invalidate` itself. A
+    load that was running when its key got invalidated doesn't store its
+    (possibly stale) result. Every caller gets its own deep copy, so unsaved
+    changes of one handler are never seen, or saved, by another.
+    """
+
+    __slots__ = ("name", "model", "key", "_cache", "_loading", "hits", "misses", "loads", "invalidations")
+
+    def __init__(self, name: str, model: type[D], key: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.model = model
+        self.key = key
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._loading: dict[Any, asyncio.Future[Optional[D]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+        caches[name] = self
+
+    @staticmethod
+    def _copy(document: Optional[D]) -> Optional[D]:
+        return None if document is None else document.model_copy(deep=True)
+
+    async def get(self, value: Any) -> Optional[D]:
+        document = self._cache.get(value)
+        if document is not None:
+            self.hits += 1
+            return None if document is _MISSING else self._copy(document)
+
+        self.misses += 1
+        while (pending := self._loading.get(value)) is not None:
+            document = await asyncio.shield(pending)
+            if document is not _RETRY:
+                return self._copy(document)
+            if (document := self._cache.get(value)) is not None:
+                return None if document is _MISSING else self._copy(document)
+        return self._copy(await self._load(value))
+
+    async def _load(self, value: Any) -> Optional[D]:
+        future = self._loading[value] = asyncio.get_running_loop().create_future()
+        try:
+            self.loads += 1
+            document = await self.model.find_one({self.key: value})
+            if self._loading.get(value) is future:
+                self._cache[value] = _MISSING if document is None else document
+            future.set_result(document)
+            return document
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; the waiters aren't, and one of them loads again.
+            if self._loading.get(value) is future:
+                del self._loading[value]
+            future.set_result(_RETRY)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the error; nobody else is left to retrieve it.
+            future.exception()
+            raise
+        finally:
+            if self._loading.get(value) is future:
+                del self._loading[value]
+
+    def put(self, document: D) -> None:
+        self._cache[getattr(document, self.key)] = self._copy(document)
+
+    def invalidate(self, value: Any) -> None:
+        self.invalidations += 1
+        self._cache.pop(value, None)
+        self._loading.pop(value, None)
+
+    def clear(self) -> None:
+        self.invalidations += 1
+        self._cache.clear()
+        self._loading.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'loads': self.loads,
+            'coalesced': self.misses - self.loads,
+            'invalidations': self.invalidations,
+            'size': len(self._cache),
+            'maxsize': self._cache.maxsize,
+        }
+
+
+def invalidate(name: str, value: Any) -> None:
+    if (cache := caches.get(name)) is not None:
+        cache.invalidate(value)
+
+
+def document_cache_stats() -> dict[str, dict[str, Any]]:
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+register_metrics('document_caches', document_cache_stats)
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import suppress
+from typing import Optional
+from uuid import UUID, uuid4
+
+from bson import Binary
+from loguru import logger
+from pymongo import UpdateOne
+
+from src.utils.lifecycle import on_shutdown, on_startup
+from src.utils.metrics import register_metrics
+from .models import Trainer, trainer_cache
+
+FLUSH_INTERVAL = 2.0
+# A flush is started early once this many trainers have pending changes.
+FLUSH_THRESHOLD = 1000
+FLUSH_BATCH_SIZE = 500
+
+COUNTER_FIELDS = frozenset({
+    'xp', 'balance', 'trophy',
+    'pokemon_caught', 'shiny_pokemon_caught', 'pokemon_released', 'pokeballs_used',
+    'pokemon_caught_streak', 'shiny_pokemon_caught_streak',
+    'win', 'win_strike', 'loss',
+})
+
+INC, MAX, SET = '$inc', '$max', '$set'
+
+_last_sequence = 0
+
+
+def _next_sequence() -> int:
+    """Increasing across calls and, being clock based, across restarts."""
+    global _last_sequence
+    _last_sequence = max(_last_sequence + 1, time.time_ns())
+    return _last_sequence
+
+
+class CounterStage:
+    """Changes of one trainer that fit in a single update: at most one operator per field."""
+
+    __slots__ = ("ops", "sequence", "revision_id", "written")
+
+    def __init__(self) -> None:
+        self.ops: dict[str, tuple[str, int]] = {}
+        # The `counter_sequence` and revision id the update gives the trainer, chosen on the first attempt to write it.
+        self.sequence: Optional[int] = None
+        self.revision_id: Optional[UUID] = None
+        self.written = False
+
+    def merge(self, field: str, op: str, value: int) -> bool:
+        """Folds the change into this stage; False if it can't be expressed in the same update."""
+        current = self.ops.get(field)
+        if current is None or op == SET:
+            self.ops[field] = (op, value)
+        elif current[0] == op == INC:
+            self.ops[field] = (INC, current[1] + value)
+        elif current[0] == op == MAX:
+            self.ops[field] = (MAX, max(current[1], value))
+        elif current[0] == SET:
+            self.ops[field] = (SET, current[1] + value if op == INC else max(current[1], value))
+        else:
+            # `$inc` then `$max` of the same field (or the reverse) needs two updates.
+            return False
+        return True
+
+    def apply(self, values: dict[str, int]) -> None:
+        for field, (op, value) in self.ops.items():
+            stored = values.get(field, 0)
+            values[field] = stored + value if op == INC else max(stored, value) if op == MAX else value
+
+    def to_update(self, user_id: int) -> UpdateOne:
+        # Raw driver writes don't go through beanie's encoders, and the client has no default UUID representation.
+        revision_id = Binary.from_uuid(self.revision_id)
+        update: dict[str, dict[str, object]] = {SET: {'counter_sequence': self.sequence, 'revision_id': revision_id}}
+        for field, (op, value) in self.ops.items():
+            update.setdefault(op, {})[field] = value
+        # Only this service writes `counter_sequence`, so a retry of a write that did
+        # land matches nothing, whatever was saved to the trainer in between.
+        return UpdateOne({'user_id': user_id, 'counter_sequence': {'$not': {'$gte': self.sequence}}}, update)
+
+
+class TrainerCounters:
+    """
+    Coalesces writes to the `Trainer` counters and applies them with atomic updates.
+
+    Handlers record changes with `increment`, `maximum` and `reset` instead of
+    loading, mutating and saving the trainer. Changes are folded per trainer in
+    memory and written every `flush_interval` seconds, or as soon as
+    `flush_threshold` trainers have some, as unordered `bulk_write` batches of
+    `$inc`/`$max`/`$set` updates. Every update also sets a new `revision_id`, so a
+    revisioned save of a copy loaded before it fails instead of overwriting the
+    counters. Failed batches are retried on the next flush. Each stage carries an
+    increasing sequence stored in `Trainer.counter_sequence`, and an update only
+    matches a trainer below its sequence, so a retry never applies twice.
+
+    Until a change is written, `overlay` adds it to a loaded trainer so the user
+    reads their own writes.
+    """
+
+    __slots__ = (
+        "flush_interval", "flush_threshold", "batch_size",
+        "_pending", "_in_flight", "_task", "_wake", "_flush_lock",
+        "flushed", "failed_flushes", "unmatched"
+    )
+
+    def __init__(
+        self,
+        flush_interval: float = FLUSH_INTERVAL,
+        flush_threshold: int = FLUSH_THRESHOLD,
+        batch_size: int = FLUSH_BATCH_SIZE
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.batch_size = batch_size
+        self._pending: dict[int, list[CounterStage]] = {}
+        # Stages taken by the running flush, written or not.
+        self._in_flight: dict[int, list[CounterStage]] = {}
+        self._task: Optional[asyncio.Task[None]] = None
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.unmatched = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _record(self, user_id: int, op: str, changes: dict[str, int]) -> None:
+        unknown = changes.keys() - COUNTER_FIELDS
+        if unknown:
+            raise ValueError(f'Not trainer counters: {sorted(unknown)}')
+
+        stages = self._pending.setdefault(user_id, [])
+        for field, value in changes.items():
+            # A stage that was sent once is never changed, so its retry stays idempotent.
+            if not stages or stages[-1].sequence is not None or not stages[-1].merge(field, op, value):
+                stage = CounterStage()
+                stage.merge(field, op, value)
+                stages.append(stage)
+
+        if len(self._pending) >= self.flush_threshold:
+            self._wake.set()
+
+    def increment(self, user_id: int, **deltas: int) -> None:
+        self._record(user_id, INC, deltas)
+
+    def maximum(self, user_id: int, **values: int) -> None:
+        self._record(user_id, MAX, values)
+
+    def reset(self, user_id: int, *fields: str, value: int = 0) -> None:
+        self._record(user_id, SET, dict.fromkeys(fields, value))
+
+    def values(self, trainer: Trainer) -> dict[str, int]:
+        """The counters of `trainer` with every change not yet reflected in it applied."""
+        values = {field: getattr(trainer, field) for field in COUNTER_FIELDS}
+        stages = self._in_flight.get(trainer.user_id, []) + self._pending.get(trainer.user_id, [])
+        for stage in stages:
+            # A trainer loaded after a stage was written carries its sequence (or a later one).
+            if stage.sequence is None or stage.sequence > trainer.counter_sequence:
+                stage.apply(values)
+        return values
+
+    def overlay(self, trainer: Trainer) -> Trainer:
+        """
+        A copy of `trainer` showing its pending changes, for display only.
+
+        Saving the copy would write the changes a second time.
+        """
+        if trainer.user_id not in self._pending and trainer.user_id not in self._in_flight:
+            return trainer
+        return trainer.model_copy(update=self.values(trainer))
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            self._wake.clear()
+            # Stages left by a flush that was cancelled go first; resending a written one is harmless.
+            for user_id, stages in self._in_flight.items():
+                unwritten = [stage for stage in stages if not stage.written]
+                if unwritten:
+                    self._pending[user_id] = unwritten + self._pending.get(user_id, [])
+            self._in_flight, self._pending = self._pending, {}
+            # A trainer's later stages wait for its earlier ones, so each round writes one stage per trainer.
+            step = 0
+            while users := [user_id for user_id, stages in self._in_flight.items() if len(stages) > step]:
+                for user_id in await self._write(users, step):
+                    # Failed trainers go back to pending, in front of anything recorded since.
+                    stages = self._in_flight.pop(user_id)[step:]
+                    self._pending[user_id] = stages + self._pending.get(user_id, [])
+                step += 1
+            self._in_flight = {}
+
+    async def _write(self, user_ids: list[int], step: int) -> list[int]:
+        """Writes stage `step` of each trainer; returns the trainers whose batch failed."""
+        failed: list[int] = []
+        for start in range(0, len(user_ids), self.batch_size):
+            batch = user_ids[start:start + self.batch_size]
+            operations = []
+            for user_id in batch:
+                stage = self._in_flight[user_id][step]
+                if stage.sequence is None:
+                    stage.sequence = _next_sequence()
+                    stage.revision_id = uuid4()
+                operations.append(stage.to_update(user_id))
+            try:
+                result = await Trainer.get_motor_collection().bulk_write(operations, ordered=False)
+            except Exception:
+                self.failed_flushes += 1
+                failed += batch
+                logger.exception(f'[Trainer] Failed to flush counters of {len(batch)} trainers, will retry')
+                continue
+
+            self.flushed += len(operations)
+            for user_id in batch:
+                self._in_flight[user_id][step].written = True
+                trainer_cache.invalidate(user_id)
+            if result.matched_count < len(operations):
+                self.unmatched += len(operations) - result.matched_count
+                logger.warning(f'[Trainer] {len(operations) - result.matched_count} counter updates matched no trainer (missing, or already applied by a retried batch)')
+        return failed
+
+    async def _run(self) -> None:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            # Shielded, so `stop` cancelling this task lets a running flush finish.
+            await asyncio.shield(self.flush())
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'pending': len(self._pending),
+            'in_flight': len(self._in_flight),
+            'flushed': self.flushed,
+            'failed_flushes': self.failed_flushes,
+            'unmatched': self.unmatched,
+        }
+
+
+trainer_counters = TrainerCounters()
+register_metrics('trainer_counters', trainer_counters.stats)
+
+
+@on_startup
+async def start_trainer_counters() -> None:
+    await trainer_counters.start()
+
+
+@on_shutdown
+async def stop_trainer_counters() -> None:
+    await trainer_counters.stop()
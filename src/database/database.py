@@ -1,12 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
 from beanie import init_beanie
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+from src import PROJECT_NAME
+from src.config import ConfigManager
+from src.errors import DatabaseError
+from src.utils.metrics import register_metrics
+from .indexes import ensure_indexes, verify_query_plans
+from .migrations import migrate_dex_sets
+from .models import ChatState, Pokemon, Trainer, Sudoers
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorDatabase
+
+DOCUMENT_MODELS = [ChatState, Pokemon, Trainer, Sudoers]
+
+# Seconds between the pings that keep `ready` and the latency figures current.
+HEALTH_CHECK_INTERVAL = 30.0
+# Number of recent samples the latency percentiles are computed over.
+LATENCY_SAMPLES = 512
+
+
+@dataclass(frozen=True, slots=True)
+class DatabaseSettings:
+    uri: str
+    name: str
+    max_pool_size: int
+    min_pool_size: int
+    max_idle_time_ms: int
+    connect_timeout_ms: int
+    server_selection_timeout_ms: int
+    socket_timeout_ms: int
+    wait_queue_timeout_ms: int
+    read_preference: str
+    write_concern: int | str
+    journal: bool
+
+    @classmethod
+    def from_config(cls) -> DatabaseSettings:
+        def option(name: str, default: Any) -> Any:
+            return ConfigManager.get("database", name, default)
+
+        uri = option("URI", None)
+        if not uri:
+            raise DatabaseError('The `database.URI` option is missing. Please check your configuration file.')
+
+        return cls(
+            uri=uri,
+            name=option("NAME", "gulambi"),
+            max_pool_size=int(option("MAX_POOL_SIZE", 50)),
+            min_pool_size=int(option("MIN_POOL_SIZE", 5)),
+            max_idle_time_ms=int(option("MAX_IDLE_TIME_MS", 300_000)),
+            connect_timeout_ms=int(option("CONNECT_TIMEOUT_MS", 5_000)),
+            server_selection_timeout_ms=int(option("SERVER_SELECTION_TIMEOUT_MS", 5_000)),
+            socket_timeout_ms=int(option("SOCKET_TIMEOUT_MS", 10_000)),
+            wait_queue_timeout_ms=int(option("WAIT_QUEUE_TIMEOUT_MS", 2_000)),
+            read_preference=option("READ_PREFERENCE", "primaryPreferred"),
+            write_concern=option("WRITE_CONCERN", 1),
+            journal=bool(option("JOURNAL", True)),
+        )
+
+    def client_options(self) -> dict[str, Any]:
+        return {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "readPreference": self.read_preference,
+            "w": self.write_concern,
+            "journal": self.journal,
+        }
+
+
+class CommandLatency(monitoring.CommandListener):
+    """Records the duration of every command the client runs."""
+
+    __slots__ = ("succeeded_count", "failed_count", "samples")
+
+    def __init__(self) -> None:
+        self.succeeded_count = 0
+        self.failed_count = 0
+        self.samples: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self.succeeded_count += 1
+        self.samples.append(event.duration_micros / 1000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self.failed_count += 1
+        self.samples.append(event.duration_micros / 1000)
+
+
+def _latency_summary(samples: deque[float]) -> dict[str, Optional[float]]:
+    if not samples:
+        return {"last_ms": None, "p50_ms": None, "p95_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+    return {
+        "last_ms": samples[-1],
+        "p50_ms": statistics.median(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max_ms": ordered[-1],
+    }
 
-from src import constants
-from .models import Pokemon, Trainer, Sudoers
 
 class Database:
-  __slots__ = ('client',)
+    """
+    The process wide MongoDB connection pool, started and stopped with the application.
+
+    `start` connects with the pool settings of the `database` configuration
+    section, opens `min_pool_size` connections up front, so the first updates
+    don't pay for the handshakes, initializes beanie for every document model,
+    creates their missing indexes, checks the hot queries against them and
+    runs the pending data migrations. A background ping keeps `ready` and the round trip figures
+    current; `stats` reports them along with per command latencies.
+    """
+
+    __slots__ = ("settings", "client", "db", "ready", "commands", "pings", "ping_failures", "_ping_samples", "_monitor")
+
+    def __init__(self) -> None:
+        self.settings: Optional[DatabaseSettings] = None
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db: Optional[AsyncIOMotorDatabase] = None
+        self.ready = asyncio.Event()
+        self.commands = CommandLatency()
+        self.pings = 0
+        self.ping_failures = 0
+        self._ping_samples: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._monitor: Optional[asyncio.Task[None]] = None
+
+    async def ping(self) -> float:
+        """Round trip of a `ping` command in milliseconds; clears `ready` when it fails."""
+        if self.db is None:
+            raise DatabaseError('Database has not been started')
+
+        started = time.perf_counter()
+        try:
+            await self.db.command('ping')
+        except PyMongoError:
+            self.ping_failures += 1
+            self.ready.clear()
+            raise
+        latency = (time.perf_counter() - started) * 1000
+        self.pings += 1
+        self._ping_samples.append(latency)
+        self.ready.set()
+        return latency
+
+    async def _warm_pool(self) -> None:
+        # Concurrent pings check out distinct connections, filling the pool to its minimum.
+        await asyncio.gather(*(self.ping() for _ in range(max(1, self.settings.min_pool_size))))
+
+    async def _watch_health(self) -> None:
+        while True:
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+            try:
+                await self.ping()
+            except PyMongoError as e:
+                logger.warning(f'[Database] Health check failed: {e}')
+
+    async def start(self) -> None:
+        if self.client is not None:
+            return
+
+        self.settings = DatabaseSettings.from_config()
+        logger.info(
+            f'[Database] Connecting to `{self.settings.name}` '
+            f'(pool {self.settings.min_pool_size}-{self.settings.max_pool_size}, '
+            f'read preference {self.settings.read_preference}, w={self.settings.write_concern})'
+        )
+
+        self.client = AsyncIOMotorClient(
+            self.settings.uri,
+            appname=PROJECT_NAME,
+            event_listeners=[self.commands],
+            **self.settings.client_options(),
+        )
+        self.db = self.client[self.settings.name]
+        try:
+            await self._warm_pool()
+            # Indexes are bootstrapped by `ensure_indexes`, which reports what it builds.
+            await init_beanie(database=self.db, document_models=DOCUMENT_MODELS, skip_indexes=True)
+            await ensure_indexes(DOCUMENT_MODELS)
+            await verify_query_plans()
+            await migrate_dex_sets()
+        except BaseException as e:
+            # Whatever failed, beanie, an index helper or a cancelled start, the pool is not left open.
+            self.client.close()
+            self.client = self.db = None
+            self.ready.clear()
+            if isinstance(e, PyMongoError):
+                raise DatabaseError(f'Could not connect to the database: {e}') from e
+            raise
+
+        self._monitor = asyncio.create_task(self._watch_health())
+        logger.info(f'[Database] Ready, ping {self._ping_samples[-1]:.1f} ms')
+
+    async def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._monitor
+            self._monitor = None
+
+        if self.client is not None:
+            self.client.close()
+            self.client = self.db = None
+        self.ready.clear()
+        logger.info('[Database] Connection pool closed')
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "ready": self.ready.is_set(),
+            "pings": self.pings,
+            "ping_failures": self.ping_failures,
+            "ping": _latency_summary(self._ping_samples),
+            "commands_succeeded": self.commands.succeeded_count,
+            "commands_failed": self.commands.failed_count,
+            "commands": _latency_summary(self.commands.samples),
+            "max_pool_size": self.settings.max_pool_size if self.settings else None,
+            "min_pool_size": self.settings.min_pool_size if self.settings else None,
+        }
+
 
-  async def initialize(self):
-    self.client = AsyncIOMotorClient(constants.DB_URL)
-    await init_beanie(database=self.client.db_name, document_models=[Pokemon, Trainer, Sudoers])
-    
+database = Database()
+register_metrics('database', database.stats)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Optional
+
+from loguru import logger
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+from .models import Pokemon, Sudoers, Trainer
+
+if TYPE_CHECKING:
+    from beanie import Document
+    from pymongo import IndexModel
+
+
+class HotQuery:
+    """A query the bot runs on every interaction, and the index expected to serve it."""
+
+    __slots__ = ("model", "filter", "sort", "index")
+
+    def __init__(self, model: type[Document], filter: dict[str, Any], sort: list[tuple[str, int]], index: str) -> None:
+        self.model = model
+        self.filter = filter
+        self.sort = sort
+        self.index = index
+
+
+# Sample values only shape the plan; the queries don't need to match anything.
+HOT_QUERIES = [
+    HotQuery(Pokemon, {'owner_id': 0}, [('index', ASCENDING)], 'owner_index'),
+    HotQuery(Pokemon, {'owner_id': 0, 'index': 1}, [], 'owner_index'),
+    HotQuery(Pokemon, {'owner_id': 0, 'species_id': 1}, [('index', ASCENDING)], 'owner_species'),
+    HotQuery(Pokemon, {'owner_id': 0, 'favorite': True}, [('index', ASCENDING)], 'owner_favorite'),
+    HotQuery(Trainer, {'user_id': 0}, [], 'user_id'),
+    HotQuery(Sudoers, {'user_id': 0}, [], 'user_id'),
+]
+
+
+def _declared_indexes(model: type[Document]) -> list[IndexModel]:
+    return list(getattr(model.Settings, 'indexes', None) or [])
+
+
+async def ensure_indexes(models: list[type[Document]]) -> None:
+    """
+    Creates the indexes declared in each model's `Settings` that don't exist yet.
+
+    Existing indexes are never dropped or rebuilt, so this is safe on every
+    startup. An index that can't be built (e.g. a unique one over duplicated
+    documents) is logged and skipped rather than keeping the bot down.
+    """
+    for model in models:
+        collection = model.get_motor_collection()
+        existing = await collection.index_information()
+        for index in _declared_indexes(model):
+            name = index.document['name']
+            if name in existing:
+                continue
+            try:
+                await collection.create_indexes([index])
+            except OperationFailure as e:
+                logger.error(f'[Database] Could not create index `{name}` on `{collection.name}`: {e}')
+                continue
+            logger.info(f'[Database] Created index `{name}` on `{collection.name}`')
+
+
+def _plan_stages(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    stages = [plan]
+    for child in ('inputStage', 'queryPlan'):
+        if child in plan:
+            stages += _plan_stages(plan[child])
+    for child in plan.get('inputStages', ()):
+        stages += _plan_stages(child)
+    return stages
+
+
+def _index_used(explanation: dict[str, Any]) -> Optional[str]:
+    """The index name of the winning plan, `'COLLSCAN'`, or None for an empty collection (`EOF`)."""
+    stages = _plan_stages(explanation.get('queryPlanner', {}).get('winningPlan', {}))
+    for stage in stages:
+        if 'indexName' in stage:
+            return stage['indexName']
+    if any(stage.get('stage') == 'COLLSCAN' for stage in stages):
+        return 'COLLSCAN'
+    return None
+
+
+async def verify_query_plans() -> bool:
+    """Explains every hot query and warns about those not using their index; True if all do."""
+    healthy = True
+    for query in HOT_QUERIES:
+        cursor = query.model.get_motor_collection().find(query.filter).limit(1)
+        if query.sort:
+            cursor = cursor.sort(query.sort)
+        try:
+            used = _index_used(await cursor.explain())
+        except OperationFailure as e:
+            logger.warning(f'[Database] Could not explain query on `{query.model.Settings.name}`: {e}')
+            continue
+
+        if used is None or used == query.index:
+            continue
+        healthy = False
+        logger.warning(
+            f'[Database] Query {query.filter} sorted by {query.sort} on `{query.model.Settings.name}` '
+            f'uses {used} instead of index `{query.index}`'
+        )
+    return healthy
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from loguru import logger
+from pymongo import UpdateOne
+
+from .models import Trainer, trainer_cache
+from .types import DexSet, encode_dex_set
+
+DEX_SET_FIELDS = ('pokemon_seen', 'pokemon_obtained')
+MIGRATION_BATCH_SIZE = 500
+# Collection holding one marker document per completed migration, keyed by its name.
+MIGRATIONS_COLLECTION = 'migrations'
+DEX_SETS_MIGRATION = 'dex_sets'
+
+
+async def migrate_dex_sets() -> int:
+    """
+    Rewrites the `DexSet` fields of trainers still stored as lists of ids.
+
+    Trainers with list fields load fine in the meantime, and converted ones no
+    longer match, so this is safe to run again. Once a run leaves no list
+    behind, a marker document records it and later startups skip the
+    collection scan. Returns the number of trainers converted.
+    """
+    collection = Trainer.get_motor_collection()
+    migrations = collection.database[MIGRATIONS_COLLECTION]
+    if await migrations.find_one({'_id': DEX_SETS_MIGRATION}, {'_id': 1}) is not None:
+        return 0
+
+    query = {'$or': [{field: {'$type': 'array'}} for field in DEX_SET_FIELDS]}
+    projection = dict.fromkeys(DEX_SET_FIELDS, 1)
+
+    converted = skipped = 0
+    operations: list[UpdateOne] = []
+    async for document in collection.find(query, projection):
+        try:
+            changes = {
+                field: encode_dex_set(DexSet.validate(document[field]))
+                for field in DEX_SET_FIELDS
+                if isinstance(document.get(field), list)
+            }
+        except Exception:
+            # One unreadable trainer mustn't keep the bot from starting; it stays a list until fixed.
+            logger.exception(f'[Database] Could not convert the dex lists of trainer {document["_id"]}, skipping')
+            skipped += 1
+            continue
+        # Matched on the old value too, so a list changed meanwhile is picked up next time instead of lost.
+        operations.append(UpdateOne(
+            {'_id': document['_id'], **{field: document[field] for field in changes}},
+            {'$set': changes},
+        ))
+        if len(operations) >= MIGRATION_BATCH_SIZE:
+            modified = (await collection.bulk_write(operations, ordered=False)).modified_count
+            converted, skipped = converted + modified, skipped + len(operations) - modified
+            operations = []
+    if operations:
+        modified = (await collection.bulk_write(operations, ordered=False)).modified_count
+        converted, skipped = converted + modified, skipped + len(operations) - modified
+
+    if converted:
+        trainer_cache.clear()
+        logger.info(f'[Database] Converted the dex lists of {converted} trainers to bitsets')
+    if skipped:
+        # Left for the next startup, along with the lists changed while this run read them.
+        logger.warning(f'[Database] {skipped} trainers still have dex lists, the migration will run again')
+    else:
+        await migrations.update_one(
+            {'_id': DEX_SETS_MIGRATION},
+            {'$set': {'completed_at': datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+    return converted
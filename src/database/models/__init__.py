@@ -1,9 +1,13 @@
+from .chat import ChatState
 from .pokemon import Pokemon
-from .sudoers import Sudoers
-from .trainer import Trainer
+from .sudoers import Sudoers, sudoers_cache
+from .trainer import Trainer, trainer_cache
 
 __all__ = (
+  "ChatState",
   "Pokemon",
   "Sudoers",
-  "Trainer"
+  "Trainer",
+  "sudoers_cache",
+  "trainer_cache"
 )
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+
+class ChatState(Document):
+    """Per-chat spawn state, written behind by `src.modules.appears._state.ChatStateStore`."""
+
+    class Settings:
+        name = 'chat_state'
+        keep_nulls = True
+        indexes = [
+            IndexModel([('chat_id', ASCENDING)], name='chat_id', unique=True),
+        ]
+
+    chat_id: int
+    messages_remaining: Optional[int] = Field(default=None)
+
+    # Wild Pokémon currently waiting to be caught
+    active_species_id: Optional[int] = Field(default=None)
+    appeared_at: Optional[datetime] = Field(default=None)
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Optional
 
 from beanie import Document
 from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
 
 from pokedex import Pokedex
 from pokedex.enums import Gender, Nature
@@ -58,6 +59,11 @@ class Pokemon(Document):
         use_revision = True
         use_state_management = True
         state_management_replace_objects = True
+        indexes = [
+            IndexModel([('owner_id', ASCENDING), ('index', ASCENDING)], name='owner_index', unique=True),
+            IndexModel([('owner_id', ASCENDING), ('species_id', ASCENDING), ('index', ASCENDING)], name='owner_species'),
+            IndexModel([('owner_id', ASCENDING), ('favorite', ASCENDING), ('index', ASCENDING)], name='owner_favorite'),
+        ]
 
     # General
     owner_id: int
@@ -1,21 +1,29 @@
 from datetime import datetime
 from typing import Optional
 
-from beanie import Document
+from beanie import Delete, Document, Insert, Replace, Save, SaveChanges, Update, after_event
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+from ..cache import DocumentCache
 
 
 class Sudoers(Document):
 
     class Settings:
         name = 'sudoers'
-        keep_nulls = False
-        use_cache = True
-        use_revision = True
-        use_state_management = True
-        state_management_replace_objects = True
+        indexes = [
+            IndexModel([('user_id', ASCENDING)], name='user_id', unique=True),
+        ]
 
     user_id: int
-    added_by: int
-    updated_by: Optional[int] = None
+    added_by: Optional[int] = Field(default=None)
+    updated_by: Optional[int] = Field(default=None)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+    @after_event(Insert, Replace, Save, SaveChanges, Update, Delete)
+    def _invalidate_cache(self) -> None:
+        sudoers_cache.invalidate(self.user_id)
+
+
+sudoers_cache: DocumentCache[Sudoers] = DocumentCache('sudoers', Sudoers, 'user_id', maxsize=1_000, ttl=600)
@@ -1,13 +1,16 @@
 from datetime import datetime
 from typing import Optional
 
-from beanie import Document
+from beanie import Delete, Document, Insert, Replace, Save, SaveChanges, Update, after_event
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 from pokedex import enums
+from ..cache import DocumentCache
+from ..types import DexSet, encode_dex_set
 
 
-class RefferalRequirements:
+class ReferralRequirements:
     level = 10
     pokemon_seen = 20
     pokemon_obtained = 5
@@ -21,10 +24,13 @@ class Trainer(Document):
     class Settings:
         name = 'trainer'
         keep_nulls = False
-        use_cache = True
         use_revision = True
         use_state_management = True
         state_management_replace_objects = True
+        indexes = [
+            IndexModel([('user_id', ASCENDING)], name='user_id', unique=True),
+        ]
+        bson_encoders = {DexSet: encode_dex_set}
 
     # General
     user_id: int
@@ -38,8 +44,8 @@ class Trainer(Document):
     region: enums.Region = Field(default=enums.Region.KANTO)
 
     # Pokémon
-    pokemon_seen: list = Field(default=[])
-    pokemon_obtained: list = Field(default=[])
+    pokemon_seen: DexSet = Field(default_factory=DexSet)
+    pokemon_obtained: DexSet = Field(default_factory=DexSet)
 
     shiny_pokemon_caught_streak: int = Field(default=0)
     pokemon_caught_streak: int = Field(default=0)
@@ -59,6 +65,13 @@ class Trainer(Document):
     # Shop
     balance: int = Field(default=0)
 
+    # Sequence of the last counter update applied, see `src.database.counters`.
+    counter_sequence: int = Field(default=0)
+
+    @after_event(Insert, Replace, Save, SaveChanges, Update, Delete)
+    def _invalidate_cache(self) -> None:
+        trainer_cache.invalidate(self.user_id)
+
     @property
     def is_valid_refferal(self):
         return (self.level >= ReferralRequirements.level and
@@ -66,5 +79,9 @@ class Trainer(Document):
                 len(self.pokemon_obtained) >= ReferralRequirements.pokemon_obtained and
                 self.pokemon_caught >= ReferralRequirements.pokemon_caught and
                 self.pokeballs_used >= ReferralRequirements.pokeballs_used and
-                self.win >= ReferralRequirements.win
+                self.win >= ReferralRequirements.win and
                 self.loss >= ReferralRequirements.loss)
+
+
+# Shared with every handler; replaces beanie's query cache, which never sees our writes.
+trainer_cache: DocumentCache[Trainer] = DocumentCache('trainer', Trainer, 'user_id', maxsize=10_000, ttl=300)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from typing import Any, Self
+
+from bson import Binary
+from loguru import logger
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+# Highest national dex id the storage is sized for; bit `n` stands for dex id `n`.
+MAX_DEX_ID = 1087
+DEX_SET_BYTES = (MAX_DEX_ID + 1 + 7) // 8
+# Bits of the valid ids, 1..MAX_DEX_ID.
+_DEX_ID_MASK = (1 << (MAX_DEX_ID + 1)) - 2
+
+
+class DexSet:
+    """
+    A set of national dex ids stored as a bitset in an `int`.
+
+    Membership is a bit test and `len` a popcount, whatever the size. In MongoDB
+    it is a fixed `DEX_SET_BYTES` little-endian binary; validation also accepts
+    the lists of ids older documents hold.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, ids: Iterable[int] = ()) -> None:
+        self.bits = 0
+        for dex_id in ids:
+            self.add(dex_id)
+
+    @classmethod
+    def from_bits(cls, bits: int) -> Self:
+        dex_set = cls.__new__(cls)
+        dex_set.bits = bits
+        return dex_set
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Self:
+        bits = int.from_bytes(data, 'little')
+        if bits & ~_DEX_ID_MASK:
+            logger.warning(f'Dropping dex ids outside 1..{MAX_DEX_ID} from a stored DexSet')
+        return cls.from_bits(bits & _DEX_ID_MASK)
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[Any]) -> Self:
+        """Reads a legacy list of ids, skipping (and logging) entries that aren't storable dex ids."""
+        dex_set, skipped = cls(), []
+        for dex_id in ids:
+            try:
+                dex_set.add(int(dex_id))
+            except (TypeError, ValueError):
+                skipped.append(dex_id)
+        if skipped:
+            logger.warning(f'Skipped {len(skipped)} invalid dex ids while reading a DexSet: {skipped[:10]!r}')
+        return dex_set
+
+    def to_bytes(self) -> bytes:
+        return self.bits.to_bytes(DEX_SET_BYTES, 'little')
+
+    @staticmethod
+    def _check(dex_id: int) -> int:
+        if not 0 < dex_id <= MAX_DEX_ID:
+            raise ValueError(f'Dex id out of range: {dex_id}')
+        return dex_id
+
+    def add(self, dex_id: int) -> None:
+        self.bits |= 1 << self._check(dex_id)
+
+    def discard(self, dex_id: int) -> None:
+        if 0 < dex_id <= MAX_DEX_ID:
+            self.bits &= ~(1 << dex_id)
+
+    def __contains__(self, dex_id: object) -> bool:
+        return isinstance(dex_id, int) and dex_id > 0 and bool(self.bits >> dex_id & 1)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __iter__(self) -> Iterator[int]:
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
+
+    def __or__(self, other: DexSet) -> DexSet:
+        return DexSet.from_bits(self.bits | other.bits)
+
+    def __and__(self, other: DexSet) -> DexSet:
+        return DexSet.from_bits(self.bits & other.bits)
+
+    def __sub__(self, other: DexSet) -> DexSet:
+        return DexSet.from_bits(self.bits & ~other.bits)
+
+    def __xor__(self, other: DexSet) -> DexSet:
+        return DexSet.from_bits(self.bits ^ other.bits)
+
+    def __ior__(self, other: DexSet) -> Self:
+        self.bits |= other.bits
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, DexSet) and self.bits == other.bits
+
+    __hash__ = None  # mutable
+
+    def __repr__(self) -> str:
+        return f'DexSet({list(self)})'
+
+    @classmethod
+    def validate(cls, value: Any) -> DexSet:
+        if isinstance(value, DexSet):
+            return value
+        if isinstance(value, (bytes, bytearray)):
+            return cls.from_bytes(value)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return cls.from_ids(value)
+        raise ValueError(f'Cannot read a DexSet from {type(value).__name__}')
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda value: value.to_bytes(), when_used='unless-none'
+            ),
+        )
+
+
+def encode_dex_set(value: DexSet) -> Binary:
+    return Binary(value.to_bytes())
+
@@ -1,6 +1,6 @@
 from .router import Router
-from .rate_limiter import rate_limit
+from .rate_limiter import rate_limit, rate_limit_stats
 
 router = Router()
 
-__all__ = ("router", "rate_limit")
+__all__ = ("router", "rate_limit", "rate_limit_stats")
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, Optional
+
+from src.errors import RouterError
+
+if TYPE_CHECKING:
+    from hydrogram.filters import Filter
+
+PARAMETER_PATTERN = re.compile(r"^\{(?P<name>[A-Za-z_]\w*)(?::(?P<type>\w+))?\}$")
+
+CONVERTERS: dict[str, Callable[[str], Any]] = {
+    "int": int,
+    "str": str,
+}
+
+
+class CallbackRoute:
+    """A callback-data pattern such as `pokedex about {user_id:int} {dex_id:int}` bound to its callback."""
+
+    __slots__ = ("pattern", "verb", "parameters", "callback", "filters")
+
+    def __init__(self, pattern: str, callback: Callable[..., Any], filters: Optional[Filter] = None) -> None:
+        self.pattern = pattern
+        self.callback = callback
+        self.filters = filters
+        verb: list[str] = []
+        self.parameters: list[tuple[str, Callable[[str], Any]]] = []
+
+        for token in pattern.split():
+            if (match := PARAMETER_PATTERN.match(token)) is None:
+                if self.parameters:
+                    raise RouterError(f"Literal `{token}` after a parameter in callback pattern `{pattern}`")
+                verb.append(token)
+                continue
+
+            type_name = match.group("type") or "str"
+            if (converter := CONVERTERS.get(type_name)) is None:
+                raise RouterError(f"Unknown parameter type `{type_name}` in callback pattern `{pattern}`")
+            self.parameters.append((match.group("name"), converter))
+
+        if not verb:
+            raise RouterError(f"Callback pattern `{pattern}` has no verb")
+        self.verb: tuple[str, ...] = tuple(verb)
+
+    def __repr__(self) -> str:
+        return f"CallbackRoute({self.pattern!r} -> {getattr(self.callback, '__qualname__', self.callback)})"
+
+    def parse(self, arguments: list[str]) -> Optional[dict[str, Any]]:
+        """Converts the tokens following the verb into keyword arguments, or returns None if they don't fit."""
+        if len(arguments) != len(self.parameters):
+            return None
+        parsed: dict[str, Any] = {}
+        for (name, converter), value in zip(self.parameters, arguments):
+            try:
+                parsed[name] = converter(value)
+            except ValueError:
+                return None
+        return parsed
+
+    def bind(self, arguments: list[Any]) -> Optional[dict[str, Any]]:
+        """Names already decoded arguments (see `src.utils.keyboard.unpack_callback`), converting leftover strings."""
+        if len(arguments) != len(self.parameters):
+            return None
+        bound: dict[str, Any] = {}
+        for (name, converter), value in zip(self.parameters, arguments):
+            try:
+                bound[name] = converter(value) if isinstance(value, str) else value
+            except ValueError:
+                return None
+        return bound
+
+
+class _Node:
+    __slots__ = ("children", "routes")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        # Routes ending at this verb, keyed by their number of parameters.
+        self.routes: dict[int, CallbackRoute] = {}
+
+
+class CallbackTrie:
+    """
+    Resolves callback data to a single route by walking its space separated tokens.
+
+    Verbs are stored token by token, so a lookup costs one dict access per token of
+    the data rather than one regex per registered handler. The longest verb whose
+    route accepts the remaining tokens wins.
+    """
+
+    __slots__ = ("_root", "routes", "_lock")
+
+    def __init__(self) -> None:
+        self._root = _Node()
+        self.routes: list[CallbackRoute] = []
+        # Routes are added by decorators, which the module loader runs from its import threads.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    def add(self, route: CallbackRoute) -> None:
+        with self._lock:
+            node = self._root
+            for token in route.verb:
+                node = node.children.setdefault(token, _Node())
+
+            arity = len(route.parameters)
+            if (existing := node.routes.get(arity)) is not None:
+                raise RouterError(f"Callback pattern `{route.pattern}` conflicts with `{existing.pattern}`")
+            node.routes[arity] = route
+            self.routes.append(route)
+
+    def resolve(self, data: str) -> Optional[tuple[CallbackRoute, dict[str, Any]]]:
+        tokens = data.split(" ")
+        node = self._root
+        candidates: list[tuple[int, _Node]] = []
+
+        for depth, token in enumerate(tokens):
+            if (node := node.children.get(token)) is None:
+                break
+            if node.routes:
+                candidates.append((depth + 1, node))
+
+        for depth, node in reversed(candidates):
+            route = node.routes.get(len(tokens) - depth)
+            if route is not None and (arguments := route.parse(tokens[depth:])) is not None:
+                return route, arguments
+        return None
+
+    def lookup(self, verb: str, arguments: list[Any]) -> Optional[tuple[CallbackRoute, dict[str, Any]]]:
+        """Resolves a verb and its decoded arguments, as unpacked from compact callback data."""
+        node = self._root
+        for token in verb.split(" "):
+            if (node := node.children.get(token)) is None:
+                return None
+        route = node.routes.get(len(arguments))
+        if route is not None and (bound := route.bind(arguments)) is not None:
+            return route, bound
+        return None
@@ -2,9 +2,12 @@ from __future__ import annotations
 from collections.abc import Callable
 from typing import TYPE_CHECKING, ClassVar, Any
 
+from src.handlers.callback_dispatch_handler import CallbackDispatchHandler
 from src.handlers.callback_query_handler import CustomCallbackQueryHandler
 from src.handlers.error_handler import CustomErrorHandler
 from src.handlers.message_handler import CustomMessageHandler
+from src.utils.keyboard import register_verb
+from .callback_trie import CallbackRoute, CallbackTrie
 
 if TYPE_CHECKING:
     from hydrogram.filters import Filter
@@ -55,3 +58,47 @@ class Factory:
             return func
 
         return wrapper
+
+
+class CallbackQueryFactory(Factory):
+    __slots__ = ("trie", "dispatcher")
+
+    def __init__(self, update_name: str = "callback_query") -> None:
+        """
+        Initialize the callback query factory and its routing trie.
+
+        :param update_name: The type of update, always 'callback_query'.
+        """
+        super().__init__(update_name)
+        self.trie: CallbackTrie = CallbackTrie()
+        self.dispatcher: CallbackDispatchHandler = CallbackDispatchHandler(self.trie)
+
+    def route(self, pattern: str, filters: Filter | None = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """
+        A decorator generator that routes callback data matching `pattern` to the decorated function.
+
+        The pattern is a verb followed by typed parameters, e.g.
+        `'pokedex about {user_id:int} {dex_id:int}'`; the parsed parameters are
+        passed to the function as keyword arguments. Every routed function shares
+        one dispatch handler, so a callback query is matched once instead of once
+        per handler. Buttons can carry either the plain text form or the compact
+        form built by `src.utils.keyboard.pack_callback`.
+
+        :param pattern: The callback data pattern.
+        :param filters: A filter to apply once the route has matched (optional).
+        :return: A decorator function.
+        """
+        def wrapper(func: Callable[..., Any]) -> Callable[..., Any]:
+            route = CallbackRoute(pattern, func, filters)
+            self.trie.add(route)
+            register_verb(" ".join(route.verb))
+
+            if not hasattr(func, "handlers"):
+                func.handlers: list[tuple[Handler, int]] = []
+
+            # The loader registers the shared dispatcher only once.
+            func.handlers.append({'handler': self.dispatcher, 'group': 0})  # type: ignore[arg-type]
+
+            return func
+
+        return wrapper
@@ -1,40 +1,167 @@
 from __future__ import annotations
 
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from hydrogram.types import CallbackQuery
 from loguru import logger
-from pyrate_limiter import Duration, Limiter, Rate
-from pyrate_limiter.exceptions import BucketFullException
+
+from src.errors import RouterError
+from src.handlers.context import UpdateContext
+from src.utils.metrics import register_metrics
 
 if TYPE_CHECKING:
     from hydrogram import Client
     from hydrogram.types import Update
 
-messages_per_window = 1
-window_seconds = 1
-rate = Rate(
-          messages_per_window,
-          Duration.SECOND * window_seconds,
-       )
-limiter = Limiter(rate)
+SHARDS = 64
+# Idle buckets evicted per acquire, so eviction cost stays bounded per call.
+EVICTIONS_PER_CALL = 2
+MAX_BUCKETS_PER_SHARD = 8192
+
+
+class RateClass:
+    """`capacity` calls per `period` seconds per key, refilled continuously; keyed by user or chat id."""
+
+    __slots__ = ("name", "capacity", "period", "scope")
+
+    def __init__(self, name: str, capacity: int, period: float, scope: str = "user") -> None:
+        if scope not in ("user", "chat"):
+            raise RouterError(f"Unsupported rate limit scope: {scope}")
+        self.name = name
+        self.capacity = capacity
+        self.period = period
+        self.scope = scope
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+
+RATE_CLASSES: dict[str, RateClass] = {
+    rate_class.name: rate_class for rate_class in (
+        RateClass("default", capacity=1, period=1),
+        RateClass("burst", capacity=3, period=2),
+        RateClass("chat", capacity=20, period=60, scope="chat"),
+    )
+}
+
+
+class ShardedLimiter:
+    """
+    Token buckets for one rate class, spread over shards by integer key.
+
+    Each shard is an OrderedDict kept in last-use order, so idle buckets collect at
+    its front. A bucket untouched for a full refill period is indistinguishable from
+    a new one, so it is dropped; every acquire evicts at most a couple of them and
+    a shard never grows past `max_buckets`. Acquiring is O(1) and never blocks.
+    """
+
+    __slots__ = ("rate_class", "max_buckets", "_shards", "allowed", "throttled", "evicted")
+
+    def __init__(self, rate_class: RateClass, shards: int = SHARDS, max_buckets: int = MAX_BUCKETS_PER_SHARD) -> None:
+        self.rate_class = rate_class
+        self.max_buckets = max_buckets
+        # key -> [tokens, last refill time]
+        self._shards: list[OrderedDict[int, list[float]]] = [OrderedDict() for _ in range(shards)]
+        self.allowed = 0
+        self.throttled = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def try_acquire(self, key: int) -> bool:
+        now = time.monotonic()
+        rate_class = self.rate_class
+        shard = self._shards[key % len(self._shards)]
+
+        bucket = shard.get(key)
+        if bucket is None:
+            bucket = shard[key] = [float(rate_class.capacity), now]
+        else:
+            shard.move_to_end(key)
+            bucket[0] = min(rate_class.capacity, bucket[0] + (now - bucket[1]) * rate_class.refill_rate)
+            bucket[1] = now
 
+        self._evict(shard, now)
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            self.allowed += 1
+            return True
+        self.throttled += 1
+        return False
+
+    def _evict(self, shard: OrderedDict[int, list[float]], now: float) -> None:
+        idle_before = now - self.rate_class.period
+        for _ in range(EVICTIONS_PER_CALL):
+            if len(shard) <= 1:
+                return
+            key, (_, updated) = next(iter(shard.items()))
+            if updated > idle_before and len(shard) <= self.max_buckets:
+                return
+            del shard[key]
+            self.evicted += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "allowed": self.allowed,
+            "throttled": self.throttled,
+            "evicted": self.evicted,
+            "buckets": len(self),
+        }
+
+
+limiters: dict[str, ShardedLimiter] = {name: ShardedLimiter(rate_class) for name, rate_class in RATE_CLASSES.items()}
+# Per-handler limiters are added by the decorator, which the module loader runs from its import threads.
+_limiters_lock = threading.Lock()
+
+
+def _key(update: Update, scope: str) -> Optional[int]:
+    context = UpdateContext.of(update)
+    entity = context.chat if scope == "chat" else context.user
+    return entity.id if entity else None
+
+
+def rate_limit(rate: str = "default", per_handler: bool = False):
+    """
+    Throttles the decorated handler with the token buckets of the `rate` class.
+
+    Handlers share one set of buckets per class unless `per_handler` is set, in
+    which case the handler gets buckets of its own.
+    """
+    if (rate_class := RATE_CLASSES.get(rate)) is None:
+        raise RouterError(f"Unknown rate class: {rate}")
 
-def rate_limit():
     def decorator(callback):
+        limiter = ShardedLimiter(rate_class) if per_handler else limiters[rate]
+        if per_handler:
+            with _limiters_lock:
+                limiters[f"{rate}:{callback.__module__}.{callback.__qualname__}"] = limiter
+
         @wraps(callback)
-        async def wrapper(client: Client, update: Update):
-            user_id = f'{update.from_user.id}'
-            try:
-                limiter.try_acquire(user_id)
-            except BucketFullException:
-                logger.warning(
-                    f'Rate limit exceeded for user {user_id}. Allowed {messages_per_window} updates in {window_seconds} seconds.'
-                )
-                if isinstance(update, CallbackQuery):
-                    await update.answer(text='wait for a moment.', show_alert=True)
-            else:
-                await callback(client, update)
+        async def wrapper(client: Client, update: Update, *args, **kwargs):
+            key = _key(update, rate_class.scope)
+            if key is None or limiter.try_acquire(key):
+                return await callback(client, update, *args, **kwargs)
+
+            logger.warning(
+                f'Rate limit exceeded for {rate_class.scope} {key}. '
+                f'Allowed {rate_class.capacity} updates in {rate_class.period} seconds.'
+            )
+            if isinstance(update, CallbackQuery):
+                await update.answer(text='wait for a moment.', show_alert=True)
         return wrapper
     return decorator
+
+
+def rate_limit_stats() -> dict[str, dict[str, int]]:
+    with _limiters_lock:
+        return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+register_metrics('rate_limits', rate_limit_stats)
@@ -1,6 +1,6 @@
 from typing import Self
 
-from .factory import Factory
+from .factory import CallbackQueryFactory, Factory
 from src.errors import RouterError
 
 
@@ -9,7 +9,7 @@ class Router:
 
     def __init__(self) -> None:
         self.message: Factory = Factory("message")
-        self.callback_query: Factory = Factory("callback_query")
+        self.callback_query: CallbackQueryFactory = CallbackQueryFactory("callback_query")
         self.error: Factory = Factory("error")
 
     def __getattr__(self, name: str) -> Self:
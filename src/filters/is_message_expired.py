@@ -1,19 +1,31 @@
 from __future__ import annotations
 
+import time
 from collections.abc import Generator
 from contextlib import suppress
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any
 
+from cachetools import LRUCache
 from hydrogram.filters import Filter
-from hydrogram.errors import MessageDeleteForbidden, MessageNotModified
+from hydrogram.errors import MessageDeleteForbidden, MessageNotModified, QueryIdInvalid
 from hydrogram.types import CallbackQuery
 from loguru import logger
 
+from src.handlers.context import UpdateContext
+
 if TYPE_CHECKING:
     from hydrogram import Client
     from hydrogram.types import Update
 
+# Telegram stops accepting edits of bot messages after 48 hours; keep a safety margin.
+MAX_MESSAGE_AGE = (timedelta(days=2) - timedelta(minutes=2)).total_seconds()
+# Wall clock time at monotonic zero, so update times need no extra clock call.
+MONOTONIC_EPOCH = time.time() - time.monotonic()
+
+# (chat id, message id) of messages already answered as expired.
+EXPIRED_MESSAGES: LRUCache = LRUCache(maxsize=10_000)
+
 
 class IsMessageExpired(Filter):
     __slots__ = ("client", "update")
@@ -24,32 +36,37 @@ class IsMessageExpired(Filter):
 
     async def __call__(self) -> bool:
         update = self.update
-        if isinstance(update, CallbackQuery):
-            user = update.from_user
-            chat = update.message.chat
-            deleted = False
-
-            now = datetime.now()
-            two_days_ago = timedelta(days=2) - timedelta(minutes=2)
-            date_to_check = update.message.date
-  
-            if (now - date_to_check) >= two_days_ago:
-                logger.debug("[Filters/Message-Expired] - Yes", user=user.id, chat=chat.id)
-                await update.answer(text='Callback Expired.') 
-
-                with suppress(MessageDeleteForbidden):
-                    await update.message.delete()
-                    deleted = True
-
-                if not deleted:
-                    with suppress(MessageNotModified):
-                        await update.edit_message_text(text='Message Expired.')
-                return False
-
-            logger.debug(
-                "[Filters/Message-Expired] - No", user=user.id, chat=chat.id
-            )
+        if not isinstance(update, CallbackQuery):
+            return False
+
+        context = UpdateContext.of(update)
+        message = context.message
+        if message is None:
+            return False
+
+        key = (context.chat.id, message.id)
+        if key in EXPIRED_MESSAGES:
+            # Still answered, or the button keeps spinning until Telegram gives up on it.
+            with suppress(QueryIdInvalid):
+                await update.answer()
+            return False
+
+        if MONOTONIC_EPOCH + context.received_at - message.date.timestamp() < MAX_MESSAGE_AGE:
             return True
 
+        EXPIRED_MESSAGES[key] = True
+        logger.debug("[Filters/Message-Expired] - Yes", user=context.user.id, chat=context.chat.id)
+        await update.answer(text='Callback Expired.')
+
+        deleted = False
+        with suppress(MessageDeleteForbidden):
+            await message.delete()
+            deleted = True
+
+        if not deleted:
+            with suppress(MessageNotModified):
+                await update.edit_message_text(text='Message Expired.')
+        return False
+
     def __await__(self) -> Generator[Any, Any, bool]:
         return self.__call__().__await__()
@@ -7,40 +7,13 @@ from hydrogram.filters import Filter
 from hydrogram.types import CallbackQuery
 from loguru import logger
 
-from src.config import ConfigManager
+from src.utils.sudoers import sudoers
 
 if TYPE_CHECKING:
     from hydrogram import Client
     from hydrogram.types import Update
 
 
-def load_sudoers() -> set[int]:
-    sudoers = ConfigManager.get("telegram", "SUDOERS")
-
-    if not sudoers:
-        raise ValueError(
-            'The `SUDOERS` list was not loaded correctly.'
-            'Please check your configuration file.'
-        )
-
-    if not isinstance(sudoers, list):
-        raise ValueError(
-            'The `SUDOERS` list must be a list.'
-            'Please check your configuration file.'
-        )
-
-    if not all(isinstance(user_id, int) for user_id in sudoers):
-        raise ValueError(
-            'The `SUDOERS` list must contain only integers.'
-            'Please check your configuration file.'
-        )
-
-    return set(sudoers)
-
-
-SUDOERS = load_sudoers()
-
-
 class SudoOnly(Filter):
     __slots__ = ("client", "update")
 
@@ -54,7 +27,7 @@ class SudoOnly(Filter):
         message = update.message if is_callback else update
         user = update.from_user
 
-        if user.id in SUDOERS:
+        if user.id in sudoers:
             logger.debug("[Filters/Sudo] Access granted.", user=user.id, chat=message.chat.id)
             return True
 
@@ -1,16 +1,168 @@
 from __future__ import annotations
 
 import inspect
-from typing import Optional, TYPE_CHECKING, Union
+from typing import Any, Optional, TYPE_CHECKING
 
-from hydrogram.types import CallbackQuery, Message
+from hydrogram import ContinuePropagation, StopPropagation
+from hydrogram.filters import AndFilter, Filter, InvertFilter, OrFilter
+from loguru import logger
+
+from .context import UpdateContext
+from .scheduler import scheduler
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
-    
+    from collections.abc import Awaitable, Callable, Hashable
+
     from hydrogram import Client
-    from hydrogram.filters import Filter
-    from hydrogram.types import Update, User
+    from hydrogram.types import Update
+
+    CompiledFilter = Callable[[Client, Update, dict], Awaitable[bool]]
+
+def blocking(flt: Filter) -> Filter:
+    """Marks a synchronous filter as blocking, so it runs in the client's executor instead of inline."""
+    flt.blocking = True
+    return flt
+
+
+def _filter_key(flt: Any) -> Hashable:
+    """
+    Identifies a leaf filter by behaviour rather than identity.
+
+    `filters.command("x")` builds a new filter class per call, so two handlers
+    with the same command share a key through the code, closure and keyword
+    arguments of their filter function. Filters keeping their state in the
+    container they subclass (`filters.user`, `filters.chat`) can be changed at
+    runtime, so they are keyed by identity.
+    """
+    if isinstance(flt, type):
+        return flt
+    if isinstance(flt, (set, list, dict)):
+        return id(flt)
+
+    call = type(flt).__call__
+    code = getattr(call, "__code__", call)
+    closure = tuple(id(cell.cell_contents) for cell in getattr(call, "__closure__", None) or ())
+    attributes = []
+    for name, value in (*vars(type(flt)).items(), *vars(flt).items()):
+        if name.startswith("__"):
+            continue
+        if isinstance(value, (set, frozenset)):
+            value = frozenset(value)
+        elif isinstance(value, list):
+            value = tuple(value)
+        attributes.append((name, value))
+
+    contents = flt if isinstance(flt, frozenset) else None
+    key = (code, closure, tuple(attributes), contents)
+    try:
+        hash(key)
+    except TypeError:
+        return id(flt)
+    return key
+
+
+def _compile_leaf(flt: Any) -> CompiledFilter:
+    key = _filter_key(flt)
+
+    if isinstance(flt, type) or inspect.iscoroutinefunction(flt.__call__):
+        # Filter classes such as `SudoOnly` are built and awaited per update.
+        async def evaluate(client: Client, update: Update, results: dict) -> bool:
+            if (result := results.get(key)) is None:
+                result = results[key] = bool(await flt(client, update))
+            return result
+    elif getattr(flt, "blocking", False):
+        async def evaluate(client: Client, update: Update, results: dict) -> bool:
+            if (result := results.get(key)) is None:
+                result = results[key] = bool(await client.loop.run_in_executor(client.executor, flt, client, update))
+            return result
+    else:
+        async def evaluate(client: Client, update: Update, results: dict) -> bool:
+            if (result := results.get(key)) is None:
+                result = results[key] = bool(flt(client, update))
+            return result
+
+    return evaluate
+
+
+def _flatten(flt: Any, node_type: type) -> list[Any]:
+    if isinstance(flt, node_type):
+        return [*_flatten(flt.base, node_type), *_flatten(flt.other, node_type)]
+    return [flt]
+
+
+def compile_filter(flt: Any) -> CompiledFilter:
+    """
+    Compiles a filter tree into a single coroutine function.
+
+    Nested `&` and `|` chains are flattened and short-circuited, `~` is applied
+    inline, synchronous leaves run on the event loop unless marked `blocking`,
+    and every leaf result is kept in the update's context so handlers sharing a filter run it
+    once.
+    """
+    if isinstance(flt, InvertFilter):
+        base = compile_filter(flt.base)
+
+        async def evaluate(client: Client, update: Update, results: dict) -> bool:
+            return not await base(client, update, results)
+        return evaluate
+
+    if isinstance(flt, AndFilter):
+        operands = [compile_filter(operand) for operand in _flatten(flt, AndFilter)]
+
+        async def evaluate(client: Client, update: Update, results: dict) -> bool:
+            for operand in operands:
+                if not await operand(client, update, results):
+                    return False
+            return True
+        return evaluate
+
+    if isinstance(flt, OrFilter):
+        operands = [compile_filter(operand) for operand in _flatten(flt, OrFilter)]
+
+        async def evaluate(client: Client, update: Update, results: dict) -> bool:
+            for operand in operands:
+                if await operand(client, update, results):
+                    return True
+            return False
+        return evaluate
+
+    return _compile_leaf(flt)
+
+
+# id(filter) -> (filter, compiled); the filter is kept so its id is never reused.
+_compiled_filters: dict[int, tuple[Any, CompiledFilter]] = {}
+
+
+def get_compiled_filter(flt: Any) -> CompiledFilter:
+    entry = _compiled_filters.get(id(flt))
+    if entry is None:
+        entry = _compiled_filters[id(flt)] = (flt, compile_filter(flt))
+    return entry[1]
+
+
+async def report_error(client: Client, update: Update, exception: Exception) -> None:
+    """
+    Hands an exception raised by a scheduled callback to the client's error handlers.
+
+    Scheduled callbacks run after hydrogram's worker has moved on, so this does
+    what the dispatcher does for errors raised inside it.
+    """
+    for handler in client.dispatcher.error_handlers:
+        try:
+            if isinstance(handler, BaseHandler):
+                # Our error handlers also take the update, and call their callback from `check`.
+                if await handler.check(client, update, exception):
+                    return
+            elif await handler.check(client, exception):
+                await handler.callback(client, exception)
+                return
+        except StopPropagation:
+            return
+        except ContinuePropagation:
+            continue
+        except Exception:
+            logger.exception(f'Error handler {handler} failed')
+    logger.opt(exception=exception).error('Unhandled error in a handler callback')
 
 
 class BaseHandler:
@@ -20,34 +172,26 @@ class BaseHandler:
         self.callback = callback
         self.filters = filters
 
-    @staticmethod
-    async def _extract_message_and_user(update: Update) -> tuple[Optional[Union[Message, User]]]:
-        if isinstance(update, CallbackQuery):
-            return update.message, update.from_user
-        if isinstance(update, Message):
-            return update, update.from_user
-        return None, None
-
-    async def _process_update(self, client: Client, update: Update) -> Optional[Callable]:
-        message, user = await self._extract_message_and_user(update)
-        if not message:
-            return None
-
-        if user and not user.is_bot and message:
+    async def _process_update(self, client: Client, update: Update, context: UpdateContext) -> Optional[Callable]:
+        if context.is_from_human:
             return await self.callback(client, update)
         return None
 
-    async def _validate(self, client: Client, update: Update) -> bool:
-        message, _ = await self._extract_message_and_user(update)
-        if not message or not callable(self.filters):
+    async def _validate(self, client: Client, update: Update, context: UpdateContext) -> bool:
+        if not context.message or not callable(self.filters):
             return False
 
-        if inspect.iscoroutinefunction(self.filters.__call__):
-            return await self.filters(client, update)
-        return await client.loop.run_in_executor(
-            client.executor, self.filters, client, update
-        )  # type: ignore
+        return await self._apply_filters(self.filters, client, update, context)
+
+    @staticmethod
+    async def _apply_filters(filters: Filter, client: Client, update: Update, context: UpdateContext) -> bool:
+        return await get_compiled_filter(filters)(client, update, context.filter_results)
 
     async def _check_and_handle(self, client: Client, update: Update) -> None:
-        if await self._validate(client, update):
-            await self._process_update(client, update)
+        context = UpdateContext.of(update)
+        if await self._validate(client, update, context):
+            scheduler.submit_for(
+                context,
+                lambda: self._process_update(client, update, context),
+                on_error=lambda e: report_error(client, update, e)
+            )
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from hydrogram.handlers import CallbackQueryHandler
+
+from src.locales import Locales
+from src.utils.keyboard import is_packed_callback, unpack_callback
+from .base import BaseHandler, report_error
+from .context import UpdateContext
+from .scheduler import scheduler
+
+if TYPE_CHECKING:
+    from hydrogram import Client
+    from hydrogram.types import CallbackQuery
+
+    from src.decorators.callback_trie import CallbackTrie
+
+
+class CallbackDispatchHandler(CallbackQueryHandler, BaseHandler):
+    """Single handler for every routed callback query; the trie picks the callback and its arguments."""
+
+    def __init__(self, trie: CallbackTrie) -> None:
+        super().__init__(self._dispatch)
+        self.trie = trie
+
+    async def _dispatch(self, client: Client, callback: CallbackQuery) -> None:
+        # Never called directly; `check` resolves the route and calls its callback.
+        return None
+
+    async def check(self, client: Client, callback: CallbackQuery) -> None:
+        context = UpdateContext.of(callback)
+        data = context.callback_data
+        if not isinstance(data, str):
+            return None
+
+        if is_packed_callback(data):
+            unpacked = unpack_callback(data)
+            if unpacked is None:
+                # Buttons from an older format, a removed verb or an expired session.
+                await callback.answer(Locales.get('general', 'callback_outdated', language=callback.from_user.language_code), show_alert=True)
+                return None
+            resolved = self.trie.lookup(*unpacked)
+        else:
+            resolved = self.trie.resolve(data)
+        if resolved is None:
+            return None
+
+        route, arguments = resolved
+        context.callback_args = arguments
+        if route.filters is not None and not await self._apply_filters(route.filters, client, callback, context):
+            return None
+
+        if context.is_from_human:
+            scheduler.submit_for(
+                context,
+                lambda: route.callback(client, callback, **arguments),
+                on_error=lambda e: report_error(client, callback, e)
+            )
+        return None
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+from hydrogram.types import CallbackQuery, Message
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from hydrogram.types import Chat, Update, User
+
+# Attribute of an update holding its context; underscored so hydrogram leaves it out of reprs.
+CONTEXT_ATTRIBUTE = "_context"
+
+
+class UpdateContext:
+    """
+    What every handler, filter, the rate limiter and the error catcher need from an update.
+
+    Built once per update by `UpdateContext.of` and kept on the update itself, so
+    the chat, user and message are resolved once however many handlers look at it.
+    """
+
+    __slots__ = (
+        "update", "message", "chat", "user", "sender", "callback_data",
+        "callback_args", "date", "received_at", "filter_results", "propagation_stopped"
+    )
+
+    def __init__(self, update: Update) -> None:
+        self.update = update
+        self.message: Optional[Message] = None
+        self.chat: Optional[Chat] = None
+        self.user: Optional[User] = None
+        self.callback_data: Optional[str | bytes] = None
+        # Arguments parsed by the callback router for the route that matched.
+        self.callback_args: Optional[dict[str, Any]] = None
+        self.received_at: float = time.monotonic()
+        self.filter_results: dict = {}
+        # Set when a callback raised `StopPropagation`; the update's later callbacks are skipped.
+        self.propagation_stopped = False
+
+        if isinstance(update, CallbackQuery):
+            self.message = update.message
+            self.user = update.from_user
+            self.callback_data = update.data
+        elif isinstance(update, Message):
+            self.message = update
+            self.user = update.from_user
+
+        self.chat = self.message.chat if self.message else None
+        # Anonymous admins and channels post as a chat.
+        self.sender: Optional[User | Chat] = self.user or getattr(self.message, "sender_chat", None)
+        self.date: Optional[datetime] = self.message.date if self.message else None
+
+    @classmethod
+    def of(cls, update: Update) -> UpdateContext:
+        context = getattr(update, CONTEXT_ATTRIBUTE, None)
+        if context is None:
+            context = cls(update)
+            setattr(update, CONTEXT_ATTRIBUTE, context)
+        return context
+
+    @property
+    def command(self) -> Optional[list[str]]:
+        """The command and its arguments, once a `filters.command` filter has parsed them."""
+        return getattr(self.message, "command", None) if self.message is self.update else None
+
+    @property
+    def is_from_human(self) -> bool:
+        return self.message is not None and self.user is not None and not self.user.is_bot
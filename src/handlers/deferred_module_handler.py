@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from hydrogram.handlers import MessageHandler
+
+from .base import get_compiled_filter
+from .context import UpdateContext
+
+if TYPE_CHECKING:
+    from hydrogram import Client
+    from hydrogram.filters import Filter
+    from hydrogram.types import Message
+
+    from src.modules.core import ModuleLoader
+
+
+class DeferredModuleHandler(MessageHandler):
+    """
+    Stands in for a module left unimported at startup.
+
+    The first message matching the module's `LAZY_FILTER` imports and registers
+    it, then is handed to the module's own message handlers, which would
+    otherwise only see the updates after it.
+    """
+
+    def __init__(self, loader: ModuleLoader, module_name: str, filters: Filter) -> None:
+        super().__init__(self._load, filters)
+        self.loader = loader
+        self.module_name = module_name
+
+    async def _load(self, client: Client, message: Message) -> None:
+        # Never called directly; `check` loads the module and forwards the message.
+        return None
+
+    async def check(self, client: Client, message: Message) -> bool:
+        if self.module_name in self.loader.loaded_modules:
+            return False
+        if not await get_compiled_filter(self.filters)(client, message, UpdateContext.of(message).filter_results):
+            return False
+
+        for handler in await self.loader.load_deferred(client, self.module_name):
+            if isinstance(handler, MessageHandler):
+                await handler.check(client, message)
+        return False
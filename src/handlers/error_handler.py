@@ -13,7 +13,7 @@ if TYPE_CHECKING:
 
 class CustomErrorHandler(ErrorHandler, BaseHandler):
     async def check(self, client: Client, update: Update, exception: Exception) -> bool:
-        if not isinstance(exception, self.exceptions):
+        if not isinstance(exception, tuple(self.errors)):
             return False
 
         await self.callback(client, update, exception)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Optional
+
+from hydrogram import ContinuePropagation, StopPropagation
+from hydrogram.types import CallbackQuery
+from loguru import logger
+
+from src.utils.metrics import register_metrics
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from .context import UpdateContext
+
+MAX_IN_FLIGHT = 64
+MAX_QUEUED_PER_CHAT = 50
+# Consecutive priority jobs started before one waiting plain job gets a turn.
+PRIORITY_BURST = 4
+
+PRIORITY_CALLBACK = 0
+PRIORITY_MESSAGE = 1
+LANES = (PRIORITY_CALLBACK, PRIORITY_MESSAGE)
+
+
+class _Job:
+    __slots__ = ("priority", "factory", "on_error", "queued_at")
+
+    def __init__(
+        self,
+        priority: int,
+        factory: Callable[[], Awaitable[Any]],
+        on_error: Optional[Callable[[Exception], Awaitable[Any]]]
+    ) -> None:
+        self.priority = priority
+        self.factory = factory
+        self.on_error = on_error
+        self.queued_at = time.monotonic()
+
+
+class DispatchScheduler:
+    """
+    Runs handler callbacks with a global in-flight cap and per-chat ordering.
+
+    `submit` only queues the job, so hydrogram's workers go back to the update
+    queue at once and a busy chat never holds one up; jobs run on tasks owned by
+    the scheduler. Every chat has a FIFO queue, and at most one of its jobs runs
+    at a time. Chats with work wait in a lane picked by the priority of their next
+    job, callbacks before plain messages. Each lane is served round-robin, one job
+    per chat per turn, so a flooding chat cannot starve the others. After
+    `PRIORITY_BURST` priority jobs in a row a waiting plain job is started. When a
+    chat already has `max_queued_per_chat` jobs waiting, new ones are dropped.
+    """
+
+    __slots__ = (
+        "max_in_flight", "max_queued_per_chat", "in_flight", "_queues", "_lanes", "_running", "_tasks",
+        "_burst", "submitted", "completed", "failed", "dropped", "max_depth", "_wait_total"
+    )
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, max_queued_per_chat: int = MAX_QUEUED_PER_CHAT) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queued_per_chat = max_queued_per_chat
+        self.in_flight = 0
+        self._queues: dict[int, deque[_Job]] = {}
+        self._lanes: tuple[deque[int], ...] = tuple(deque() for _ in LANES)
+        self._running: set[int] = set()
+        # Strong references to the running jobs, which the event loop alone doesn't keep.
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._burst = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._wait_total = 0.0
+
+    def submit(
+        self,
+        chat_id: int,
+        priority: int,
+        factory: Callable[[], Awaitable[Any]],
+        on_error: Optional[Callable[[Exception], Awaitable[Any]]] = None
+    ) -> bool:
+        """
+        Queues `factory()` behind the chat's earlier jobs without waiting for it.
+
+        An exception raised by the job is passed to `on_error`. Returns False if the
+        chat's queue was full and the job was dropped.
+        """
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = deque()
+        elif len(queue) >= self.max_queued_per_chat:
+            self.dropped += 1
+            logger.warning(
+                f"[Scheduler] Chat {chat_id} has {len(queue)} queued updates, dropped one "
+                f"({self.dropped} dropped in total)"
+            )
+            return False
+
+        queue.append(_Job(priority, factory, on_error))
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, len(queue))
+        if chat_id not in self._running and len(queue) == 1:
+            self._lanes[priority].append(chat_id)
+        self._pump()
+        return True
+
+    def submit_for(
+        self,
+        context: UpdateContext,
+        factory: Callable[[], Awaitable[Any]],
+        on_error: Optional[Callable[[Exception], Awaitable[Any]]] = None
+    ) -> bool:
+        """
+        Schedules a handler callback for the update of `context`, in its chat's queue and lane.
+
+        An update's callbacks share that queue and run in handler group order, so
+        `StopPropagation` raised by one skips the ones after it, as it would in the
+        dispatcher; `ContinuePropagation` just ends the callback.
+        """
+        async def run() -> None:
+            if context.propagation_stopped:
+                return
+            try:
+                await factory()
+            except StopPropagation:
+                context.propagation_stopped = True
+            except ContinuePropagation:
+                pass
+
+        owner = context.chat or context.user
+        priority = PRIORITY_CALLBACK if isinstance(context.update, CallbackQuery) else PRIORITY_MESSAGE
+        return self.submit(owner.id if owner else 0, priority, run, on_error)
+
+    def _next_chat(self) -> Optional[int]:
+        priority_lane, message_lane = self._lanes
+        if priority_lane and not (message_lane and self._burst >= PRIORITY_BURST):
+            self._burst += 1
+            return priority_lane.popleft()
+        if message_lane:
+            self._burst = 0
+            return message_lane.popleft()
+        return None
+
+    def _pump(self) -> None:
+        while self.in_flight < self.max_in_flight:
+            chat_id = self._next_chat()
+            if chat_id is None:
+                return
+            job = self._queues[chat_id].popleft()
+            self._running.add(chat_id)
+            self.in_flight += 1
+            self._wait_total += time.monotonic() - job.queued_at
+            task = asyncio.create_task(self._execute(chat_id, job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, chat_id: int, job: _Job) -> None:
+        try:
+            await job.factory()
+        except asyncio.CancelledError:
+            self.failed += 1
+            raise
+        except Exception as e:
+            self.failed += 1
+            if job.on_error is None:
+                logger.exception(f"[Scheduler] Unhandled error in a job of chat {chat_id}")
+            else:
+                try:
+                    await job.on_error(e)
+                except Exception:
+                    logger.exception(f"[Scheduler] Error handler failed for a job of chat {chat_id}")
+        else:
+            self.completed += 1
+        finally:
+            self.in_flight -= 1
+            self._running.discard(chat_id)
+            queue = self._queues[chat_id]
+            if queue:
+                # Back of its lane, so every other waiting chat goes first.
+                self._lanes[queue[0].priority].append(chat_id)
+            else:
+                del self._queues[chat_id]
+            self._pump()
+
+    def stats(self) -> dict[str, Any]:
+        started = self.completed + self.failed + self.in_flight
+        return {
+            "in_flight": self.in_flight,
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "waiting_chats": {"callback": len(self._lanes[PRIORITY_CALLBACK]), "message": len(self._lanes[PRIORITY_MESSAGE])},
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "max_depth": self.max_depth,
+            "mean_wait": self._wait_total / started if started else 0.0,
+        }
+
+
+scheduler = DispatchScheduler()
+register_metrics('scheduler', scheduler.stats)
@@ -1,11 +1,21 @@
-from flask import Flask, render_template
+from flask import Flask, jsonify, render_template
 from threading import Thread
 
+from .database import database
+from .utils.metrics import latest_metrics
+
 app = Flask(__name__)
 @app.route('/')
 def index():
+    # Only a flag read, so it is fine from this thread; cleared when the database stops answering pings.
+    if not database.ready.is_set():
+        return "Database unavailable", 503
     return "Alive"
 
+@app.route('/metrics')
+def metrics():
+    return jsonify(latest_metrics())
+
 def run():
     app.run(host='0.0.0.0',port=8080)
 
@@ -1,4 +1,5 @@
 from pathlib import Path
+from string import Formatter
 from typing import Optional, Self, Any
 import yaml
 from loguru import logger
@@ -6,9 +7,51 @@ from loguru import logger
 from src import constants
 from src.errors import LocalesError
 
+DEFAULT_LANGUAGE = 'en'
+
+
+class Template(str):
+    """
+    A locale entry, parsed and validated once at load time.
+
+    Still a `str`, so it can be sent as is; `format` is `str.format` with errors
+    naming the entry, and entries without any braces return themselves.
+    """
+
+    def __new__(cls, text: str, key: str) -> Self:
+        template = super().__new__(cls, text)
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as e:
+            raise LocalesError(f'Malformed placeholders in locale `{key}`: {e}')
+        template.key = key
+        # Text without braces formats to itself; `{{`/`}}` escapes still need `str.format`.
+        template.literal = '{' not in text and '}' not in text
+        template.fields = frozenset(
+            field.split('.', 1)[0].split('[', 1)[0] for _, field, _, _ in parsed if field is not None
+        )
+        return template
+
+    def format(self, *args: Any, **kwargs: Any) -> str:
+        if self.literal:
+            return str(self)
+        try:
+            return str.format(self, *args, **kwargs)
+        except (KeyError, IndexError, AttributeError) as e:
+            raise LocalesError(f'Cannot render locale `{self.key}` (expects {sorted(self.fields)}): {e!r}')
+
 
 class Locales:
-    __slots__ = ("locales", "initialized")
+    """
+    Locale entries of every language, compiled into `Template`s at load time.
+
+    `locales.yaml` holds the default language, `locales.<language>.yaml` the
+    others. Every language is merged over its fallback chain (`pt-br` -> `pt` ->
+    default) when loading, so a lookup is a single dict access whatever the
+    language. `version` is bumped on every (re)load.
+    """
+
+    __slots__ = ("locales", "initialized", "templates", "version", "path")
     _instance: Optional[Self] = None
 
     def __new__(cls, *args, **kwargs) -> Self:
@@ -23,14 +66,66 @@ class Locales:
         logger.info('Initializing locales manager ...')
         logger.debug(f'Using path {loclpath}')
 
-        locales_path = Path(loclpath)
-
-        self.locales: dict[str, Any] = yaml.safe_load(locales_path.read_text(encoding='utf-8'))
+        self.path = Path(loclpath)
+        self.version = 0
+        self.load()
         self.initialized = True
 
+    def load(self) -> None:
+        raw: dict[str, dict[str, Any]] = {
+            DEFAULT_LANGUAGE: yaml.safe_load(self.path.read_text(encoding='utf-8')) or {}
+        }
+        for path in sorted(self.path.parent.glob(f'{self.path.stem}.*{self.path.suffix}')):
+            language = path.name[len(self.path.stem) + 1:-len(self.path.suffix)].lower()
+            raw[language] = yaml.safe_load(path.read_text(encoding='utf-8')) or {}
+
+        compiled = {language: self._compile(entries, language) for language, entries in raw.items()}
+        templates: dict[str, dict[tuple[str, str], Any]] = {}
+        for language in compiled:
+            merged: dict[tuple[str, str], Any] = {}
+            for fallback in reversed(self.fallback_chain(language)):
+                merged.update(compiled.get(fallback, {}))
+            templates[language] = merged
+
+        self.locales = raw[DEFAULT_LANGUAGE]
+        self.templates = templates
+        self.version += 1
+        logger.debug(f'Loaded locales for languages: {sorted(templates)}')
+
+    @staticmethod
+    def fallback_chain(language: str) -> list[str]:
+        """`pt-br` -> `['pt-br', 'pt', 'en']`."""
+        chain = [language]
+        while '-' in language:
+            language = language.rsplit('-', 1)[0]
+            chain.append(language)
+        if DEFAULT_LANGUAGE not in chain:
+            chain.append(DEFAULT_LANGUAGE)
+        return chain
+
+    @staticmethod
+    def _compile(entries: dict[str, Any], language: str) -> dict[tuple[str, str], Any]:
+        compiled: dict[tuple[str, str], Any] = {}
+        for section, options in entries.items():
+            for option, value in (options or {}).items():
+                key = f'{language}:{section}.{option}'
+                compiled[section, option] = Template(value, key) if isinstance(value, str) else value
+        return compiled
+
+    @classmethod
+    def get_version(cls) -> int:
+        return cls._instance.version if cls._instance else 0
+
     @classmethod
-    def get(cls, section: str, option: str, fallback: str = '') -> str:
+    def get(cls, section: str, option: str, fallback: str = '', language: Optional[str] = None) -> str:
         if not cls._instance:
             raise LocalesError('Locales instance has not been initialized')
 
-        return cls._instance.locales.get(section, {}).get(option, fallback)
+        templates = cls._instance.templates
+        entries = templates.get(language.lower(), None) if language else None
+        if entries is None:
+            if language and '-' in language:
+                # Unknown regional variant: use its base language, as resolved at load.
+                entries = templates.get(language.lower().split('-', 1)[0])
+            entries = entries or templates[DEFAULT_LANGUAGE]
+        return entries.get((section, option), fallback)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import random
+from array import array
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+
+from pokedex import Pokedex
+from ._state import ChatStateStore, store
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from pokedex.enums import Region
+
+# Group messages needed before a wild Pokémon appears, drawn again after every spawn.
+MIN_MESSAGES_PER_SPAWN = 40
+MAX_MESSAGES_PER_SPAWN = 80
+
+
+class AliasTable:
+    """Samples ids proportionally to their weights in O(1), using Vose's alias method."""
+
+    __slots__ = ("ids", "probability", "alias")
+
+    def __init__(self, weights: Mapping[int, float]) -> None:
+        self.ids = array("l")
+        scaled: list[float] = []
+        for species_id, weight in weights.items():
+            if weight > 0:
+                self.ids.append(species_id)
+                scaled.append(weight)
+
+        size = len(scaled)
+        total = sum(scaled)
+        self.probability = array("d", [0.0] * size)
+        self.alias = array("l", [0] * size)
+        if not size:
+            return
+
+        scaled = [weight * size / total for weight in scaled]
+        small = [index for index, weight in enumerate(scaled) if weight < 1.0]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1.0]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        # Leftovers are 1.0 up to floating point error.
+        for index in large + small:
+            self.probability[index] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def sample(self, rng: random.Random) -> int:
+        index = int(rng.random() * len(self.ids))
+        if rng.random() < self.probability[index]:
+            return self.ids[index]
+        return self.ids[self.alias[index]]
+
+
+class SpawnEngine:
+    """
+    Picks wild Pokémon weighted by their `appear_rate`.
+
+    One alias table is kept per region (and one for all species, under `None`) and
+    built on first use. `set_weight` overrides a species' weight and only marks the
+    regions containing it for rebuild; reloading the pokedex drops every table.
+    """
+
+    __slots__ = ("_rng", "_version", "_weights", "_overrides", "_members", "_tables")
+
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        self._rng = rng or random.Random()
+        self._version = -1
+        self._weights: dict[int, float] = {}
+        self._overrides: dict[int, float] = {}
+        self._members: dict[Optional[str], frozenset[int]] = {}
+        self._tables: dict[Optional[str], AliasTable] = {}
+
+    def _sync(self) -> None:
+        if self._version == Pokedex.version:
+            return
+
+        table = Pokedex.stats_table
+        self._weights = dict(zip(table.columns["id"], table.columns["appear_rate"]))
+        self._members.clear()
+        self._tables.clear()
+        self._version = Pokedex.version
+        logger.debug(f"[Appears] Spawn weights loaded for {len(self._weights)} species")
+
+    def _build(self, region: Optional[str]) -> AliasTable:
+        if region not in self._members:
+            ids = self._weights if region is None else Pokedex.query_pokemon_ids(region=region)
+            self._members[region] = frozenset(ids)
+
+        weights = {
+            species_id: self._overrides.get(species_id, self._weights.get(species_id, 0))
+            for species_id in self._members[region]
+        }
+        table = self._tables[region] = AliasTable(weights)
+        logger.debug(f"[Appears] Built spawn table for region={region} with {len(table)} species")
+        return table
+
+    def set_weight(self, species_id: int, weight: float) -> None:
+        self._sync()
+        self._overrides[species_id] = weight
+        self._invalidate(species_id)
+
+    def reset_weight(self, species_id: int) -> None:
+        self._sync()
+        if self._overrides.pop(species_id, None) is not None:
+            self._invalidate(species_id)
+
+    def _invalidate(self, species_id: int) -> None:
+        for region, members in self._members.items():
+            if species_id in members:
+                self._tables.pop(region, None)
+
+    def choose(self, region: Optional[Region | str] = None) -> Optional[int]:
+        """Returns a weighted random species id from `region` (or any region), None if nothing can spawn."""
+        self._sync()
+        key = getattr(region, "value", region)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._build(key)
+        return table.sample(self._rng) if len(table) else None
+
+
+class SpawnTrigger:
+    """Counts group messages per chat and fires once every few dozen messages; counters live in the state store."""
+
+    __slots__ = ("_rng", "_store")
+
+    def __init__(self, state_store: ChatStateStore, rng: Optional[random.Random] = None) -> None:
+        self._rng = rng or random.Random()
+        self._store = state_store
+
+    def _threshold(self) -> int:
+        return self._rng.randint(MIN_MESSAGES_PER_SPAWN, MAX_MESSAGES_PER_SPAWN)
+
+    async def hit(self, chat_id: int) -> bool:
+        state = await self._store.get(chat_id)
+        remaining = state.messages_remaining
+        if remaining is None:
+            remaining = self._threshold()
+
+        fired = remaining <= 1
+        state.messages_remaining = self._threshold() if fired else remaining - 1
+        self._store.mark_dirty(state)
+        return fired
+
+
+engine = SpawnEngine()
+trigger = SpawnTrigger(store)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from datetime import datetime
+from typing import Optional
+
+from loguru import logger
+from pymongo import UpdateOne
+
+from src.database.models import ChatState
+from src.utils.lifecycle import on_shutdown, on_startup
+
+FLUSH_INTERVAL = 5.0
+FLUSH_BATCH_SIZE = 500
+# Clean chats idle for longer than this are dropped from memory after a flush.
+IDLE_TTL = 30 * 60
+MAX_CHATS = 50_000
+
+
+class ChatSpawnState:
+    __slots__ = ("chat_id", "messages_remaining", "active_species_id", "appeared_at", "last_seen", "dirty")
+
+    def __init__(
+        self,
+        chat_id: int,
+        messages_remaining: Optional[int] = None,
+        active_species_id: Optional[int] = None,
+        appeared_at: Optional[datetime] = None
+    ) -> None:
+        self.chat_id = chat_id
+        self.messages_remaining = messages_remaining
+        self.active_species_id = active_species_id
+        self.appeared_at = appeared_at
+        self.last_seen = time.monotonic()
+        self.dirty = False
+
+    def to_update(self) -> UpdateOne:
+        return UpdateOne(
+            {"chat_id": self.chat_id},
+            {"$set": {
+                "messages_remaining": self.messages_remaining,
+                "active_species_id": self.active_species_id,
+                "appeared_at": self.appeared_at,
+                "updated_at": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+
+
+class ChatStateStore:
+    """
+    Keeps per-chat spawn state in memory and writes it behind to MongoDB.
+
+    A chat is read from the database once, on its first message since start-up;
+    after that every change only marks it dirty. Dirty chats are written every
+    `flush_interval` seconds as unordered `bulk_write` batches of idempotent `$set`
+    upserts. A failed batch leaves its chats dirty so the next flush retries them,
+    and the last flush runs on shutdown. Clean chats idle for `idle_ttl` seconds,
+    or the least recently seen ones beyond `max_chats`, are evicted.
+    """
+
+    __slots__ = (
+        "flush_interval", "batch_size", "idle_ttl", "max_chats",
+        "_states", "_loading", "_task", "_flush_lock", "flushed", "failed_flushes"
+    )
+
+    def __init__(
+        self,
+        flush_interval: float = FLUSH_INTERVAL,
+        batch_size: int = FLUSH_BATCH_SIZE,
+        idle_ttl: float = IDLE_TTL,
+        max_chats: int = MAX_CHATS
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.idle_ttl = idle_ttl
+        self.max_chats = max_chats
+        self._states: OrderedDict[int, ChatSpawnState] = OrderedDict()
+        self._loading: dict[int, asyncio.Future[ChatSpawnState]] = {}
+        self._task: Optional[asyncio.Task[None]] = None
+        self._flush_lock = asyncio.Lock()
+        self.flushed = 0
+        self.failed_flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    async def get(self, chat_id: int) -> ChatSpawnState:
+        state = self._states.get(chat_id)
+        if state is None:
+            # A flush may have evicted the loaded state while this caller waited for it.
+            state = self._states.setdefault(chat_id, await self._load(chat_id))
+        state.last_seen = time.monotonic()
+        self._states.move_to_end(chat_id)
+        return state
+
+    async def _load(self, chat_id: int) -> ChatSpawnState:
+        # Concurrent first messages from one chat share a single read.
+        if (pending := self._loading.get(chat_id)) is not None:
+            return await asyncio.shield(pending)
+
+        future = self._loading[chat_id] = asyncio.get_running_loop().create_future()
+        try:
+            document = None
+            try:
+                document = await ChatState.find_one(ChatState.chat_id == chat_id)
+            except Exception:
+                logger.exception(f"[Appears] Could not load state of chat {chat_id}, starting fresh")
+
+            state = ChatSpawnState(chat_id)
+            if document is not None:
+                state.messages_remaining = document.messages_remaining
+                state.active_species_id = document.active_species_id
+                state.appeared_at = document.appeared_at
+            self._states[chat_id] = state
+            future.set_result(state)
+            return state
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._loading[chat_id]
+
+    @staticmethod
+    def mark_dirty(state: ChatSpawnState) -> None:
+        state.dirty = True
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            dirty = [state for state in self._states.values() if state.dirty]
+            for start in range(0, len(dirty), self.batch_size):
+                batch = dirty[start:start + self.batch_size]
+                operations = []
+                for state in batch:
+                    # Cleared before the write, so changes made while it is in flight mark the chat again.
+                    state.dirty = False
+                    operations.append(state.to_update())
+                try:
+                    await ChatState.get_motor_collection().bulk_write(operations, ordered=False)
+                    self.flushed += len(operations)
+                except Exception:
+                    self.failed_flushes += 1
+                    for state in batch:
+                        state.dirty = True
+                    logger.exception(f"[Appears] Failed to flush {len(operations)} chat states, will retry")
+            self._evict()
+
+    def _evict(self) -> None:
+        deadline = time.monotonic() - self.idle_ttl
+        overflow = len(self._states) - self.max_chats
+        for chat_id, state in list(self._states.items()):
+            if state.last_seen >= deadline and overflow <= 0:
+                break
+            if not state.dirty:
+                del self._states[chat_id]
+                overflow -= 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+
+store = ChatStateStore()
+
+
+@on_startup
+async def start_state_store() -> None:
+    await store.start()
+
+
+@on_shutdown
+async def stop_state_store() -> None:
+    await store.stop()
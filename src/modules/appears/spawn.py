@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from hydrogram import filters
+
+from pokedex import Pokedex
+from src.decorators import router
+from src.locales import Locales
+from ._spawner import engine, trigger
+from ._state import store
+
+
+@router.message(filters.group & ~filters.service, group=1)
+async def appear_on_message(client, message) -> None:
+    if not await trigger.hit(message.chat.id):
+        return
+
+    species_id = engine.choose()
+    if species_id is None:
+        return
+
+    pokemon = Pokedex.get_pokemon(species_id)
+    caption = Locales.get('appears', 'wild_pokemon').format(name=pokemon.name.capitalize())
+    await message.reply_photo(photo=pokemon.sprites.normal, caption=caption, quote=False)
+
+    state = await store.get(message.chat.id)
+    state.active_species_id = species_id
+    state.appeared_at = datetime.utcnow()
+    store.mark_dirty(state)
@@ -1,27 +1,61 @@
 from __future__ import annotations
 
+import asyncio
 import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from hydrogram.handlers.handler import Handler
 from loguru import logger
 
+from src.handlers.deferred_module_handler import DeferredModuleHandler
+
 if TYPE_CHECKING:
     from types import ModuleType
-    
+
     from hydrogram import Client
+    from hydrogram.filters import Filter
+
+IMPORT_WORKERS = 8
+# Group of the placeholders of deferred modules, ahead of every real handler.
+DEFERRED_GROUP = -100
+
+
+class ModuleTiming:
+    __slots__ = ("name", "status", "files", "handlers", "import_seconds", "register_seconds")
+
+    def __init__(self, name: str, files: int) -> None:
+        self.name = name
+        self.status = "pending"
+        self.files = files
+        self.handlers = 0
+        self.import_seconds = 0.0
+        self.register_seconds = 0.0
 
 
 class ModuleLoader:
-    """Discovers, loads, and registers modules and their handlers."""
+    """Discovers, loads, and registers modules and their handlers.
+
+    Handler files are independent of each other, so they are imported together
+    in a thread pool and only registered with the client, one module at a time,
+    back on the event loop. A module whose package sets `LAZY_FILTER` is not
+    imported at startup; a placeholder imports it on the first matching message.
+    """
 
     def __init__(self) -> None:
         """Initializes the ModuleLoader."""
         self.modules: dict[str, dict[str, list[str]]] = {}
         self.parent_path: Path = Path(__file__).parent
         self.loaded_modules: set[str] = set()
+        # Handlers can be shared between functions (e.g. the callback dispatcher) and must be added once.
+        self.registered_handlers: set[int] = set()
+        self.timings: dict[str, ModuleTiming] = {}
+        self._deferred: dict[str, DeferredModuleHandler] = {}
+        self._loading: dict[str, asyncio.Future[list[Handler]]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     async def discover_modules(self) -> None:
         """Discovers modules (directories containing Python files) in the parent directory."""
@@ -32,7 +66,7 @@ class ModuleLoader:
                 module_name = entry.name
                 handlers = [
                     f"{module_name}.{file.stem}"
-                    for file in entry.glob("*.py")
+                    for file in sorted(entry.glob("*.py"))
                     if not file.name.startswith("_")
                 ]
                 if handlers:
@@ -41,6 +75,84 @@ class ModuleLoader:
                 else:
                     logger.warning(f'Module `{module_name}` has no handlers. Skipping.')
 
+    @staticmethod
+    def _lazy_filter(module_name: str) -> Optional[Filter]:
+        """Returns the `LAZY_FILTER` of a module's package, importing only its `__init__`."""
+        try:
+            package: ModuleType = import_module(f".{module_name}", "src.modules")
+        except Exception:
+            logger.exception(f'Error reading module package: {module_name}')
+            return None
+        return getattr(package, "LAZY_FILTER", None)
+
+    @staticmethod
+    def _import_component(handler_path: str, retry_deadlock: bool = True) -> tuple[Optional[ModuleType], float, bool]:
+        """Imports one handler file; runs in the import pool. The flag asks for a retry outside the pool."""
+        started = time.perf_counter()
+        try:
+            component: ModuleType = import_module(f".{handler_path}", "src.modules")
+        except Exception as e:
+            # importlib breaks a cycle between modules imported by two threads by failing one of them.
+            if retry_deadlock and type(e).__name__ == '_DeadlockError':
+                logger.debug(f'Import deadlock on {handler_path}, retrying after the pool')
+                return None, time.perf_counter() - started, True
+            logger.exception(f'Error loading handler: {handler_path}')
+            component = None
+        return component, time.perf_counter() - started, False
+
+    async def _import_module(self, module_name: str, handlers: list[str]) -> list[Optional[ModuleType]]:
+        loop = asyncio.get_running_loop()
+        timing = self.timings.setdefault(module_name, ModuleTiming(module_name, len(handlers)))
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._import_component, handler_path)
+            for handler_path in handlers
+        ))
+        components: list[Optional[ModuleType]] = []
+        for handler_path, (component, seconds, retry) in zip(handlers, results):
+            if retry:
+                component, retry_seconds, _ = self._import_component(handler_path, retry_deadlock=False)
+                seconds += retry_seconds
+            timing.import_seconds += seconds
+            components.append(component)
+        return components
+
+    def _register(self, client: Client, module_name: str, components: list[Optional[ModuleType]]) -> tuple[bool, list[Handler]]:
+        started = time.perf_counter()
+        success = True
+        registered: list[Handler] = []
+
+        for component in components:
+            if component is None:
+                success = False
+                continue
+            logger.debug(f'Imported component: {component.__name__}')
+
+            for name, obj in vars(component).items():
+                if not (inspect.isfunction(obj) and hasattr(obj, "handlers")):
+                    continue
+
+                for handler_data in obj.handlers:
+                    handler: Handler = handler_data.get("handler")
+                    group: int = handler_data.get("group", 0)
+
+                    if not isinstance(handler, Handler):
+                        logger.warning(f'Invalid handler type: {type(handler).__name__} in {module_name}.{name}. Skipping handler.')
+                        continue
+
+                    if id(handler) in self.registered_handlers:
+                        continue
+
+                    client.add_handler(handler, group)
+                    self.registered_handlers.add(id(handler))
+                    registered.append(handler)
+                    logger.debug(f'Handler registered successfully: {handler} from {module_name}.{name}')
+
+        timing = self.timings[module_name]
+        timing.register_seconds = time.perf_counter() - started
+        timing.handlers = len(registered)
+        timing.status = "loaded" if success else "errors"
+        return success, registered
+
     async def load_module(self, client: Client, module_name: str, handlers: list[str]) -> bool:
         """Loads a specific module and registers its handlers.
 
@@ -57,33 +169,10 @@ class ModuleLoader:
             return True
 
         logger.debug(f'Loading module: {module_name}')
-        success = True
-
-        for handler_path in handlers:
-            try:
-                component: ModuleType = import_module(f".{handler_path}", "src.modules")
-                logger.debug(f'Imported component: {component.__name__}')
-
-                for name, obj in vars(component).items():
-                    if not (inspect.isfunction(obj) and hasattr(obj, "handlers")):
-                        continue
-
-                    for handler_data in obj.handlers:
-                        handler: Handler = handler_data.get("handler")
-                        group: int = handler_data.get("group", 0)
-
-                        if not isinstance(handler, Handler):
-                            logger.warning(f'Invalid handler type: {type(handler).__name__} in {module_name}.{name}. Skipping handler.')
-                            continue
-
-                        client.add_handler(handler, group)
-                        logger.debug(f'Handler registered successfully: {handler} from {module_name}.{name}')
-
-            except (ModuleNotFoundError, AttributeError, TypeError) as e:
-                logger.exception(f'Error loading handler: {handler_path}')
-                success = False
-                continue
+        success, _ = self._register(client, module_name, await self._import_module(module_name, handlers))
+        return self._finish(module_name, success)
 
+    def _finish(self, module_name: str, success: bool) -> bool:
         if success:
             self.loaded_modules.add(module_name)
             logger.debug(f'Module loaded successfully: {module_name}')
@@ -92,19 +181,91 @@ class ModuleLoader:
             logger.warning(f'Module `{module_name}` loaded with errors.')
             return False
 
+    async def load_deferred(self, client: Client, module_name: str) -> list[Handler]:
+        """
+        Imports and registers a deferred module once, returning the handlers it added.
+
+        If none of its files could be imported, the placeholder is put back so a
+        later message can try again.
+        """
+        if module_name in self.loaded_modules:
+            return []
+        if (pending := self._loading.get(module_name)) is not None:
+            return await asyncio.shield(pending)
+
+        future = self._loading[module_name] = asyncio.get_running_loop().create_future()
+        placeholder = self._deferred.pop(module_name, None)
+        if placeholder is not None:
+            client.remove_handler(placeholder, DEFERRED_GROUP)
+
+        logger.info(f'Loading deferred module: {module_name}')
+        registered: list[Handler] = []
+        loaded = False
+        try:
+            # Imported on the loop's default executor, the loader's pool is shut down after startup.
+            components = await self._import_module(module_name, self.modules[module_name]["handlers"])
+            loaded = any(component is not None for component in components)
+            if loaded:
+                success, registered = self._register(client, module_name, components)
+                self._finish(module_name, success)
+            self.log_timings()
+        except Exception:
+            logger.exception(f'Error loading deferred module: {module_name}')
+        finally:
+            del self._loading[module_name]
+            if not loaded and placeholder is not None:
+                self._deferred[module_name] = placeholder
+                client.add_handler(placeholder, DEFERRED_GROUP)
+                self.timings[module_name].status = "deferred"
+            future.set_result(registered)
+        return registered
+
     async def load_all(self, client: Client) -> None:
         """Loads all discovered modules."""
         logger.debug('Loading all modules...')
 
         await self.discover_modules()
 
-        loaded_count = 0
+        eager: dict[str, list[str]] = {}
         for module_name, module_info in self.modules.items():
-            if await self.load_module(client, module_name, module_info["handlers"]):
+            lazy_filter = self._lazy_filter(module_name)
+            if lazy_filter is None:
+                eager[module_name] = module_info["handlers"]
+                continue
+            placeholder = self._deferred[module_name] = DeferredModuleHandler(self, module_name, lazy_filter)
+            client.add_handler(placeholder, DEFERRED_GROUP)
+            self.timings[module_name] = ModuleTiming(module_name, len(module_info["handlers"]))
+            self.timings[module_name].status = "deferred"
+
+        self._executor = self._executor or ThreadPoolExecutor(
+            max_workers=IMPORT_WORKERS, thread_name_prefix="module-loader"
+        )
+        try:
+            imported = await asyncio.gather(*(
+                self._import_module(module_name, handlers) for module_name, handlers in eager.items()
+            ))
+        finally:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        loaded_count = 0
+        for module_name, components in zip(eager, imported):
+            success, _ = self._register(client, module_name, components)
+            if self._finish(module_name, success):
                 loaded_count += 1
 
-        logger.info(f'Loaded {loaded_count} of {len(self.modules)} modules')
+        logger.info(f'Loaded {loaded_count} of {len(self.modules)} modules ({len(self._deferred)} deferred)')
         if self.modules:
             logger.info(f'Loaded modules: {self.loaded_modules}')
+            self.log_timings()
         else:
             logger.info('No modules found to load.')
+
+    def log_timings(self) -> None:
+        rows = [f"{'module':<16}{'status':<10}{'files':>6}{'handlers':>10}{'import ms':>12}{'register ms':>13}"]
+        for timing in sorted(self.timings.values(), key=lambda timing: timing.import_seconds, reverse=True):
+            rows.append(
+                f'{timing.name:<16}{timing.status:<10}{timing.files:>6}{timing.handlers:>10}'
+                f'{timing.import_seconds * 1000:>12.1f}{timing.register_seconds * 1000:>13.2f}'
+            )
+        logger.info('Module load timings:\n' + '\n'.join(rows))
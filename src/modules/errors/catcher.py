@@ -3,16 +3,17 @@ import sys
 import traceback
 from typing import Optional, Union
 
+import aiofiles
 from hydrogram.errors import ChatWriteForbidden
 from loguru import logger
 
 from src import constants
 from src.config import ConfigManager
 from src.decorators import router
+from src.handlers.context import UpdateContext
 from src.utils.keyboard import Keyboard
 from src.utils.paspybin import paste
 from src.utils.utility import delete_if_exists
-from ._utils import extract_data
 
 
 async def log_exception(
@@ -49,7 +50,8 @@ async def log_exception(
     
 @router.error()
 async def handle_error(client, update, exception) -> None:
-    chat, user, message, callback_data = extract_data(update)
+    context = UpdateContext.of(update)
+    chat, user, message, callback_data = context.chat, context.sender, context.message, context.callback_data
     
     if isinstance(exception, ChatWriteForbidden) and chat:
         logger.exception(
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from loguru import logger
 
 from pokedex import Pokedex
 from src.locales import Locales
-from src.utils.keyboard import Keyboard
+from src.utils.keyboard import VIEWER, Keyboard
+from src.utils.metrics import register_metrics
+from src.utils.render_cache import RenderCache
 
 if TYPE_CHECKING:
     from hydrogram.types import User
@@ -17,31 +19,53 @@ if TYPE_CHECKING:
 MOVES_PER_PAGE = 5
 
 
-def get_pokemon_base_stats_data(user: User, pokemon: Pokemon) -> str:
-    caption = Locales.get('pokedex', 'pokemon_basestats')
-    keyboard = [[("Back to Pokemon", f"pokedex about {user.id} {pokemon.id}")]]
-    return caption.format(pokemon.base_stats), Keyboard(keyboard)
+def _render_stamp() -> tuple[int, int]:
+    return Pokedex.version, Locales.get_version()
 
-def get_pokemon_ev_yields_data(pokemon: Pokemon) -> str:
-    caption, evs = Locales.get('pokedex', 'pokemon_ev_yields'), ''
+
+# Views are cached without the viewer: keyboards keep `VIEWER` in their callback
+# arguments and are packed for the user by `Keyboard(rows, viewer=...)`.
+pokemon_views = RenderCache('pokedex', maxsize=4096, stamp=_render_stamp)
+
+register_metrics('pokedex_registry', lambda: Pokedex.registry.stats())
+
+
+@pokemon_views
+def _pokemon_base_stats_view(dex_id: int, language: Optional[str]) -> tuple:
+    pokemon = Pokedex.get_pokemon(dex_id)
+    caption = Locales.get('pokedex', 'pokemon_basestats', language=language)
+    keyboard = [[("Back to Pokemon", ('pokedex about', VIEWER, pokemon.id))]]
+    return caption.format(pokemon.base_stats), keyboard
+
+def get_pokemon_base_stats_data(user: User, pokemon: Pokemon) -> tuple:
+    caption, keyboard = _pokemon_base_stats_view(pokemon.id, user.language_code)
+    return caption, Keyboard(keyboard, viewer=user.id)
+
+@pokemon_views
+def _pokemon_ev_yields_view(dex_id: int, language: Optional[str]) -> str:
+    pokemon = Pokedex.get_pokemon(dex_id)
+    caption, evs = Locales.get('pokedex', 'pokemon_ev_yields', language=language), ''
     for stat, ev_yield in pokemon.ev_yields.items():
         evs += f'\n\n+{ev_yield} {stat}'
     return caption.format(name=pokemon.name.capitalize(), evs=evs)
 
-def get_pokemon_reply_markup(user: User, pokemon: Pokemon):
+def get_pokemon_ev_yields_data(user: User, pokemon: Pokemon) -> str:
+    return _pokemon_ev_yields_view(pokemon.id, user.language_code)
+
+def _pokemon_reply_rows(pokemon: Pokemon) -> list:
     keyboard: list[list[tuple[str, str]]] = []
 
     evolution_buttons: list[tuple[str, str]] = []
     if pokemon.evolves_from:
         try:
             evolves_from = Pokedex.get_pokemon(pokemon.evolves_from)
-            evolution_buttons.append((evolves_from.name.capitalize(), f'pokedex about {user.id} {evolves_from.id}'))
+            evolution_buttons.append((evolves_from.name.capitalize(), ('pokedex about', VIEWER, evolves_from.id)))
         except Exception:
             logger.exception(f'Error fetching evolution data for: {pokemon.name}')
     if pokemon.evolves_to:
         try:
             evolves_to = Pokedex.get_pokemon(pokemon.evolves_to.id)
-            evolution_buttons.append((f'{evolves_to.name.capitalize()} (min lvl {pokemon.evolves_to.min_level})', f'pokedex about {user.id} {evolves_to.id}'))
+            evolution_buttons.append((f'{evolves_to.name.capitalize()} (min lvl {pokemon.evolves_to.min_level})', ('pokedex about', VIEWER, evolves_to.id)))
         except Exception:
             logger.exception(f'Error fetching evolution data for: {pokemon.name}')
 
@@ -49,16 +73,16 @@ def get_pokemon_reply_markup(user: User, pokemon: Pokemon):
         keyboard.append(evolution_buttons)
 
     keyboard.append([
-        ('Base Stats', f'pokedex base-stats {user.id} {pokemon.id}'),
-        ('EV yields', f'ev-yields {pokemon.id}')
+        ('Base Stats', ('pokedex base-stats', VIEWER, pokemon.id)),
+        ('EV yields', ('ev-yields', pokemon.id))
     ])
 
-    keyboard.append([('Learnable Moves', f'pokedex learnable-moves {user.id} {pokemon.id} level-up 0')])
-    return Keyboard(keyboard)
+    keyboard.append([('Learnable Moves', ('pokedex learnable-moves', VIEWER, pokemon.id, 'level-up', 0))])
+    return keyboard
 
-def get_pokemon_data(user: User, pokemon: Pokemon) -> tuple:
-    photo = pokemon.sprites.normal
-    reply_markup = get_pokemon_reply_markup(user, pokemon)
+@pokemon_views
+def _pokemon_about_view(dex_id: int, language: Optional[str]) -> tuple:
+    pokemon = Pokedex.get_pokemon(dex_id)
     caption_data = {
         'id': pokemon.id,
         'name': pokemon.name.capitalize(),
@@ -66,17 +90,25 @@ def get_pokemon_data(user: User, pokemon: Pokemon) -> tuple:
         'growth_rate': pokemon.growth_rate.value.capitalize(),
         'region': ', '.join(region.value.capitalize() for region in pokemon.regions)
     }
-    caption = Locales.get('pokedex', 'pokemon_about')
-    return photo, caption.format(**caption_data), reply_markup
+    caption = Locales.get('pokedex', 'pokemon_about', language=language)
+    return pokemon.sprites.normal, caption.format(**caption_data), _pokemon_reply_rows(pokemon)
+
+def get_pokemon_reply_markup(user: User, pokemon: Pokemon):
+    _, _, keyboard = _pokemon_about_view(pokemon.id, user.language_code)
+    return Keyboard(keyboard, viewer=user.id)
+
+def get_pokemon_data(user: User, pokemon: Pokemon) -> tuple:
+    photo, caption, keyboard = _pokemon_about_view(pokemon.id, user.language_code)
+    return photo, caption, Keyboard(keyboard, viewer=user.id)
 
 def get_similar_pokemon(user: User, pokemon: list[Pokemon]) -> tuple:
     keyboard: list[list[tuple[str, str]]] = []
     for poke in pokemon:
-        keyboard.append([(poke.name, f'pokedex about {user.id} {poke.id}')])
-    text = Locales.get('pokedex', 'similar_pokemon')
-    return text, Keyboard(keyboard)
+        keyboard.append([(poke.name, ('pokedex about', VIEWER, poke.id))])
+    text = Locales.get('pokedex', 'similar_pokemon', language=user.language_code)
+    return text, Keyboard(keyboard, viewer=user.id)
 
-def get_pokemon_learnable_moves_reply_markup(user: User, pokemon: Pokemon, method: str, offset: int):
+def _pokemon_learnable_moves_rows(pokemon: Pokemon, method: str, offset: int) -> list:
     keyboard: list[list[tuple[str, str]]] = []
 
     if method == 'level-up':
@@ -96,9 +128,9 @@ def get_pokemon_learnable_moves_reply_markup(user: User, pokemon: Pokemon, metho
 
     if method == 'level-up':
         level_up = ('• Level Up •', 'ignore')
-        machine = ('TM / TR', f'pokedex learnable-moves {user.id} {pokemon.id} machine 0')
+        machine = ('TM / TR', ('pokedex learnable-moves', VIEWER, pokemon.id, 'machine', 0))
     elif method == 'machine':
-        level_up = ('Level Up', f'pokedex learnable-moves {user.id} {pokemon.id} level-up 0')
+        level_up = ('Level Up', ('pokedex learnable-moves', VIEWER, pokemon.id, 'level-up', 0))
         machine = ('• TM / TR •', 'ignore')
 
     if level_up and machine:
@@ -106,18 +138,23 @@ def get_pokemon_learnable_moves_reply_markup(user: User, pokemon: Pokemon, metho
 
     navigation_buttons: list[tuple[str, str]] = []
     if has_previous:
-        navigation_buttons.append(("Previous", f"pokedex learnable-moves {user.id} {pokemon.id} {method} {offset - MOVES_PER_PAGE}"))
+        navigation_buttons.append(("Previous", ('pokedex learnable-moves', VIEWER, pokemon.id, method, offset - MOVES_PER_PAGE)))
     navigation_buttons.append((f'{current_page}/{total_pages}', 'ignore'))
     if has_next and not last_page:
-        navigation_buttons.append(("Next", f"pokedex learnable-moves {user.id} {pokemon.id} {method} {offset + MOVES_PER_PAGE}"))
+        navigation_buttons.append(("Next", ('pokedex learnable-moves', VIEWER, pokemon.id, method, offset + MOVES_PER_PAGE)))
 
     if navigation_buttons:
         keyboard.append(navigation_buttons)
 
-    keyboard.append([("Back to Pokemon", f"pokedex about {user.id} {pokemon.id}")])
-    return Keyboard(keyboard)
+    keyboard.append([("Back to Pokemon", ('pokedex about', VIEWER, pokemon.id))])
+    return keyboard
 
-def get_pokemon_learnable_moves_data(user: User, pokemon: Pokemon, method: str, offset: int) -> tuple:
+def get_pokemon_learnable_moves_reply_markup(user: User, pokemon: Pokemon, method: str, offset: int):
+    return Keyboard(_pokemon_learnable_moves_rows(pokemon, method, offset), viewer=user.id)
+
+@pokemon_views
+def _pokemon_learnable_moves_view(dex_id: int, method: str, offset: int, language: Optional[str]) -> tuple:
+    pokemon = Pokedex.get_pokemon(dex_id)
     try:
         if method == 'level-up':
             _learnable_moves: list[PokemonLearnableMove] = pokemon.learnable_moves.level_up
@@ -131,9 +168,10 @@ def get_pokemon_learnable_moves_data(user: User, pokemon: Pokemon, method: str,
         logger.warning(f'Offset {offset} is out of range for {pokemon.name} learnable moves.')
 
     if not learnable_moves:
-        return 'No more learnable moves found.', Keyboard([[("Back to Pokemon", f"pokedex about {user.id} {pokemon.id}")]])
+        return 'No more learnable moves found.', [[("Back to Pokemon", ('pokedex about', VIEWER, pokemon.id))]]
 
     caption = '<b><u>Learnable Moves</u></b>\n'
+    move_about = Locales.get('pokedex', 'pokemon_learnable_moves', language=language)
     for learnable_move in learnable_moves:
         move = Pokedex.get_move(learnable_move.id)
         if not move:
@@ -144,8 +182,10 @@ def get_pokemon_learnable_moves_data(user: User, pokemon: Pokemon, method: str,
             'accuracy': move.accuracy,
             'min_level': learnable_move.min_level
         }
-        move_about = Locales.get('pokedex', 'pokemon_learnable_moves')
         caption += '\n\n' + move_about.format(**caption_data)
 
-    reply_markup = get_pokemon_learnable_moves_reply_markup(user, pokemon, method, offset)
-    return caption, reply_markup
+    return caption, _pokemon_learnable_moves_rows(pokemon, method, offset)
+
+def get_pokemon_learnable_moves_data(user: User, pokemon: Pokemon, method: str, offset: int) -> tuple:
+    caption, keyboard = _pokemon_learnable_moves_view(pokemon.id, method, offset, user.language_code)
+    return caption, Keyboard(keyboard, viewer=user.id)
@@ -1,8 +1,6 @@
 from contextlib import suppress
 
-from hydrogram import filters
 from hydrogram.errors import MessageNotModified
-from hydrogram.types import CallbackQuery
 
 from pokedex import Pokedex
 from src.decorators import router, rate_limit
@@ -10,24 +8,21 @@ from src.filters import IsMessageExpired
 from ._utils import get_pokemon_base_stats_data, get_pokemon_ev_yields_data
 
 
-@router.callback_query(filters.regex(r'^ev-yields (\d+)$') & IsMessageExpired)
+@router.callback_query.route('ev-yields {dex_id:int}', filters=IsMessageExpired)
 @rate_limit()
-async def pokemon_ev_yields_callback(client, update) -> None:
-    dex_id = int(update.matches[0].group(1))
+async def pokemon_ev_yields_callback(client, update, dex_id: int) -> None:
     pokemon = Pokedex.get_pokemon(dex_id)
-    ev_yields = get_pokemon_ev_yields_data(pokemon)
+    ev_yields = get_pokemon_ev_yields_data(update.from_user, pokemon)
     await update.answer(ev_yields, show_alert=True)
 
-@router.callback_query(filters.regex(r'^pokedex base-stats (\d+) (\d+)$') & IsMessageExpired)
+@router.callback_query.route('pokedex base-stats {user_id:int} {dex_id:int}', filters=IsMessageExpired)
 @rate_limit()
-async def pokemon_base_stats_callback(client, update) -> None:
+async def pokemon_base_stats_callback(client, update, user_id: int, dex_id: int) -> None:
     user = update.from_user
-    user_id = int(update.matches[0].group(1))
 
     if user.id != user_id:
         return await update.answer('you cannot use this.')
 
-    dex_id = int(update.matches[0].group(2))
     pokemon = Pokedex.get_pokemon(dex_id)
     caption, reply_markup = get_pokemon_base_stats_data(user, pokemon)
     with suppress(MessageNotModified):
@@ -2,7 +2,7 @@ from contextlib import suppress
 
 from hydrogram import filters
 from hydrogram.errors import MessageNotModified
-from hydrogram.types import CallbackQuery, InputMediaPhoto
+from hydrogram.types import InputMediaPhoto
 
 from pokedex import Pokedex 
 from src.decorators import router, rate_limit
@@ -34,16 +34,14 @@ async def pokedex_command(client, message) -> None:
         await message.reply_photo(photo=photo, caption=caption, reply_markup=reply_markup)
 
 
-@router.callback_query(filters.regex(r'^pokedex about (\d+) (\d+)$') & IsMessageExpired)
+@router.callback_query.route('pokedex about {user_id:int} {dex_id:int}', filters=IsMessageExpired)
 @rate_limit()
-async def pokedex_callback(client, update) -> None:
+async def pokedex_callback(client, update, user_id: int, dex_id: int) -> None:
     user = update.from_user
-    user_id = int(update.matches[0].group(1))
 
     if user.id != user_id:
         return await update.answer('you cannot use this.')
 
-    dex_id = int(update.matches[0].group(2))
     pokemon = Pokedex.get_pokemon(dex_id)
 
     photo, caption, reply_markup = get_pokemon_data(user, pokemon)
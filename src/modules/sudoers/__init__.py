@@ -1 +1,4 @@
+from hydrogram import filters
 
+# Sudo-only tools; imported on their first command instead of at startup.
+LAZY_FILTER = filters.command(['eval', 'sudo'])
@@ -1,8 +1,10 @@
 from hydrogram import filters
+from hydrogram.errors import PeerIdInvalid, UsernameInvalid, UsernameNotOccupied
 
 from src.decorators import router, rate_limit
 from src.filters import SudoOnly
 from src.locales import Locales
+from src.utils.sudoers import sudoers
 
 VALID_ACTIONS = {'access', 'update', 'remove'}
 
@@ -12,6 +14,11 @@ VALID_ACTIONS = {'access', 'update', 'remove'}
 async def sudo_command(client, message) -> None:
     action = user = identifier = None
 
+    if message.command[1:] == ['update']:
+        await sudoers.refresh()
+        text = Locales.get('sudoers', 'registry_updated')
+        return await message.reply(text.format(version=sudoers.version))
+
     if message.reply_to_message and len(message.command) == 2:
         action = message.command[1]
         user = message.reply_to_message.from_user
@@ -24,7 +31,7 @@ async def sudo_command(client, message) -> None:
                 text = Locales.get('general', 'invalid_user_id')
                 return await message.reply(text)
         except ValueError:
-            if not (identifier.startswith('@') and len(identifier) < 3):
+            if not identifier.startswith('@') or len(identifier) < 3:
                 text = Locales.get('general', 'invalid_user_format')
                 return await message.reply(text)
     else:
@@ -34,10 +41,25 @@ async def sudo_command(client, message) -> None:
     if action not in VALID_ACTIONS:
         text = Locales.get('sudoers', 'privileges_usage')
         return await message.reply(text)
-    if identifier and not user:
+    if identifier is not None and user is None:
         try:
             user = await client.get_users(identifier)
-        except PeerIdInvalid:
+        except (PeerIdInvalid, UsernameInvalid, UsernameNotOccupied):
             text = Locales.get('general', 'invalid_user_format')
             return await message.reply(text)
-    # to do
+    if user is None:
+        # Replies to channel posts and anonymous admins carry no user.
+        text = Locales.get('general', 'invalid_user_id')
+        return await message.reply(text)
+
+    if action == 'access':
+        granted = await sudoers.grant(user.id, added_by=message.from_user.id)
+        text = Locales.get('sudoers', 'access_granted' if granted else 'already_sudoer')
+    elif action == 'remove':
+        revoked = await sudoers.revoke(user.id)
+        text = Locales.get('sudoers', 'access_removed' if revoked else 'not_revocable')
+    else:
+        await sudoers.refresh()
+        text = Locales.get('sudoers', 'registry_updated')
+        return await message.reply(text.format(version=sudoers.version))
+    await message.reply(text.format(user=user.mention))
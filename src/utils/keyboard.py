@@ -1,9 +1,19 @@
-from typing import List, Tuple, Optional
+import base64
+import secrets
+import threading
+import zlib
+from typing import Any, Dict, List, Tuple, Optional, Union
+
+from cachetools import TTLCache
 from hydrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+# Stands for the viewing user's id in the callback arguments of a cached keyboard layout.
+VIEWER = object()
+
 
 def Keyboard(
-  rows: Optional[List[List[Tuple[str, str]]]] = None
+  rows: Optional[List[List[Tuple[str, str]]]] = None,
+  viewer: Optional[int] = None
 ) -> InlineKeyboardMarkup:
     if rows is None:
         rows = []
@@ -12,11 +22,14 @@ def Keyboard(
     for row in rows:
         line = []
         for button in row:
-            button = (
-                btn(button, button)
-                if isinstance(button, str)
-                else btn(*button)
-            )
+            if isinstance(button, str):
+                button = btn(button, button)
+            elif isinstance(button[1], tuple):
+                # (text, (verb, *args)): packed now, with VIEWER replaced by `viewer`.
+                verb, *args = button[1]
+                button = btn(button[0], pack_callback(verb, *(viewer if arg is VIEWER else arg for arg in args)))
+            else:
+                button = btn(*button)
             line.append(button)
         lines.append(line)
     return InlineKeyboardMarkup(inline_keyboard=lines)
@@ -27,3 +40,137 @@ def btn(
   type: str = "callback_data"
 ) -> InlineKeyboardButton:
     return InlineKeyboardButton(text=text, **{type: value})
+
+
+# Compact callback data
+#
+# Packed callback data is PREFIX followed by the unpadded base64url form of
+#
+#     version    one byte, CALLBACK_VERSION
+#     verb id    two bytes, big endian: crc32 of the verb, truncated
+#     arguments  one varint header per argument, `(n << 2) | tag`, where n is the
+#                zigzag encoded value of an int, or the byte length of the utf-8
+#                string or session token that follows it
+#
+# Verb ids are derived from the verb text, so buttons stay valid across restarts
+# as long as the verb is still routed. Unknown versions, unknown verbs, malformed
+# payloads and expired sessions all unpack to None.
+
+CALLBACK_PREFIX = '~'
+CALLBACK_VERSION = 1
+CALLBACK_DATA_LIMIT = 64
+
+SESSION_TTL = 15 * 60
+SESSION_MAXSIZE = 10_000
+SESSION_TOKEN_BYTES = 6
+
+_TAG_INT, _TAG_STR, _TAG_SESSION = 0, 1, 2
+
+_verbs: Dict[int, str] = {}
+_verb_ids: Dict[str, int] = {}
+# Verbs are registered by decorators, which the module loader runs from its import threads.
+_verbs_lock = threading.Lock()
+_sessions: TTLCache = TTLCache(maxsize=SESSION_MAXSIZE, ttl=SESSION_TTL)
+
+
+class Session:
+    """Wraps a callback argument too large for callback data; it is kept server side for `SESSION_TTL` seconds."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+def register_verb(verb: str) -> int:
+    """Returns the stable id of `verb`, registering it for `unpack_callback`."""
+    with _verbs_lock:
+        if (verb_id := _verb_ids.get(verb)) is not None:
+            return verb_id
+
+        verb_id = zlib.crc32(verb.encode()) & 0xFFFF
+        if (existing := _verbs.get(verb_id)) is not None:
+            raise ValueError(f'Callback verb `{verb}` collides with `{existing}`, rename one of them')
+        _verbs[verb_id] = verb
+        _verb_ids[verb] = verb_id
+        return verb_id
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value > 0x7F:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def pack_callback(verb: str, *args: Union[int, str, Session]) -> str:
+    """Packs a routed verb and its arguments into callback data."""
+    buffer = bytearray((CALLBACK_VERSION,))
+    buffer += register_verb(verb).to_bytes(2, 'big')
+
+    for arg in args:
+        if isinstance(arg, Session):
+            token = secrets.token_bytes(SESSION_TOKEN_BYTES)
+            _sessions[token] = arg.value
+            _write_varint(buffer, len(token) << 2 | _TAG_SESSION)
+            buffer += token
+        elif isinstance(arg, int):
+            _write_varint(buffer, (arg << 1 if arg >= 0 else (-arg << 1) - 1) << 2 | _TAG_INT)
+        else:
+            encoded = str(arg).encode()
+            _write_varint(buffer, len(encoded) << 2 | _TAG_STR)
+            buffer += encoded
+
+    data = CALLBACK_PREFIX + base64.urlsafe_b64encode(buffer).rstrip(b'=').decode()
+    if len(data) > CALLBACK_DATA_LIMIT:
+        raise ValueError(f'Callback data for `{verb}` is {len(data)} bytes, over the {CALLBACK_DATA_LIMIT} byte limit')
+    return data
+
+
+def is_packed_callback(data: str) -> bool:
+    return data.startswith(CALLBACK_PREFIX)
+
+
+def unpack_callback(data: str) -> Optional[Tuple[str, List[Any]]]:
+    """Returns the verb and arguments of packed callback data, or None if it is stale or malformed."""
+    try:
+        payload = data[len(CALLBACK_PREFIX):]
+        raw = base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))
+        if len(raw) < 3 or raw[0] != CALLBACK_VERSION:
+            return None
+        verb = _verbs.get(int.from_bytes(raw[1:3], 'big'))
+        if verb is None:
+            return None
+
+        args: List[Any] = []
+        position = 3
+        while position < len(raw):
+            header, position = _read_varint(raw, position)
+            tag, value = header & 0b11, header >> 2
+            if tag == _TAG_INT:
+                args.append(value >> 1 if not value & 1 else -((value + 1) >> 1))
+                continue
+            chunk = raw[position:position + value]
+            if len(chunk) != value:
+                return None
+            position += value
+            if tag == _TAG_STR:
+                args.append(chunk.decode())
+            elif tag == _TAG_SESSION and chunk in _sessions:
+                args.append(_sessions[chunk])
+            else:
+                return None
+        return verb, args
+    except (ValueError, IndexError):
+        return None
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    Hook = Callable[[], Awaitable[None]]
+
+_startup_hooks: list[Hook] = []
+_shutdown_hooks: list[Hook] = []
+
+
+def on_startup(hook: Hook) -> Hook:
+    """Registers a coroutine function to run once the application has started and loaded its modules."""
+    _startup_hooks.append(hook)
+    return hook
+
+
+def on_shutdown(hook: Hook) -> Hook:
+    """Registers a coroutine function to run when the application stops, in reverse registration order."""
+    _shutdown_hooks.append(hook)
+    return hook
+
+
+async def run_startup_hooks() -> None:
+    for hook in _startup_hooks:
+        logger.debug(f'Running startup hook: {hook.__qualname__}')
+        await hook()
+
+
+async def run_shutdown_hooks() -> None:
+    for hook in reversed(_shutdown_hooks):
+        logger.debug(f'Running shutdown hook: {hook.__qualname__}')
+        try:
+            await hook()
+        except Exception:
+            logger.exception(f'Shutdown hook failed: {hook.__qualname__}')
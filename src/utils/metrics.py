@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, Optional
+
+from loguru import logger
+
+from .lifecycle import on_shutdown, on_startup
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Seconds between two snapshots of the registered counters.
+METRICS_INTERVAL = 30.0
+
+_sources: dict[str, Callable[[], Any]] = {}
+_latest: dict[str, Any] = {}
+_task: Optional[asyncio.Task[None]] = None
+
+
+def register_metrics(name: str, collect: Callable[[], Any]) -> None:
+    """Adds `collect()` to every snapshot under `name`; it runs on the event loop."""
+    _sources[name] = collect
+
+
+def collect_metrics() -> dict[str, Any]:
+    metrics = {}
+    for name, collect in _sources.items():
+        try:
+            metrics[name] = collect()
+        except Exception:
+            logger.exception(f'[Metrics] Could not collect `{name}`')
+    return metrics
+
+
+def latest_metrics() -> dict[str, Any]:
+    """
+    The last snapshot, safe to read from other threads.
+
+    The counters are only ever read on the event loop; readers such as the
+    health checker get the snapshot it took last.
+    """
+    return _latest
+
+
+async def _run() -> None:
+    global _latest
+    while True:
+        _latest = collect_metrics()
+        logger.debug(f'[Metrics] {_latest}')
+        await asyncio.sleep(METRICS_INTERVAL)
+
+
+@on_startup
+async def start_metrics() -> None:
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_run())
+
+
+@on_shutdown
+async def stop_metrics() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _task
+        _task = None
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from functools import wraps
+from typing import Any, TypeVar
+
+from cachetools import LRUCache
+
+from .metrics import register_metrics
+
+T = TypeVar('T')
+
+caches: dict[str, RenderCache] = {}
+
+
+class RenderCache:
+    """
+    Bounded LRU cache of rendered views that empties itself when its sources change.
+
+    `stamp` returns the versions of everything a view is built from (e.g. the
+    pokedex and the locales); a different stamp on lookup drops every entry.
+    Viewer specific parts must stay out of the cached value and be filled in by
+    the caller.
+    """
+
+    __slots__ = ('name', 'stamp', '_cache', '_stamp', 'hits', 'misses', 'invalidations')
+
+    def __init__(self, name: str, maxsize: int, stamp: Callable[[], Hashable]) -> None:
+        self.name = name
+        self.stamp = stamp
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._stamp: Hashable = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        caches[name] = self
+
+    def get(self, key: Hashable, render: Callable[[], T]) -> T:
+        stamp = self.stamp()
+        if stamp != self._stamp:
+            if self._cache:
+                self.invalidations += 1
+            self._cache.clear()
+            self._stamp = stamp
+
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            value = self._cache[key] = render()
+            return value
+        self.hits += 1
+        return value
+
+    def __call__(self, func: Callable[..., T]) -> Callable[..., T]:
+        """Memoizes `func` by its positional arguments; views sharing a cache never share keys."""
+        name = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args: Any) -> T:
+            return self.get((name, *args), lambda: func(*args))
+        return wrapper
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'size': len(self._cache),
+            'maxsize': self._cache.maxsize,
+        }
+
+
+def render_cache_stats() -> dict[str, dict[str, Any]]:
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+register_metrics('render_caches', render_cache_stats)
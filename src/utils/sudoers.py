@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from typing import Optional
+
+from loguru import logger
+from pymongo.errors import PyMongoError
+
+from src.config import ConfigManager
+from src.database.models import Sudoers, sudoers_cache
+from src.utils.lifecycle import on_shutdown, on_startup
+
+# Fallback refresh period when the deployment has no change streams (standalone mongod).
+POLL_INTERVAL = 30.0
+# Delay before reopening a change stream that failed.
+WATCH_RETRY_DELAY = 5.0
+
+
+def load_sudoers() -> set[int]:
+    sudoers = ConfigManager.get("telegram", "SUDOERS")
+
+    if not sudoers:
+        raise ValueError(
+            'The `SUDOERS` list was not loaded correctly.'
+            'Please check your configuration file.'
+        )
+
+    if not isinstance(sudoers, list):
+        raise ValueError(
+            'The `SUDOERS` list must be a list.'
+            'Please check your configuration file.'
+        )
+
+    if not all(isinstance(user_id, int) for user_id in sudoers):
+        raise ValueError(
+            'The `SUDOERS` list must contain only integers.'
+            'Please check your configuration file.'
+        )
+
+    return set(sudoers)
+
+
+class SudoersRegistry:
+    """
+    Sudoer ids from the configuration merged with the `sudoers` collection.
+
+    Membership is a frozenset lookup, so `SudoOnly` never touches the database.
+    The database part is reloaded on every change stream event, or polled every
+    `POLL_INTERVAL` seconds where change streams are unavailable; `version` is
+    bumped whenever the set actually changes. Config sudoers can't be revoked
+    from the bot.
+    """
+
+    __slots__ = ("config_ids", "ids", "version", "_task", "_refresh_lock")
+
+    def __init__(self, config_ids: set[int]) -> None:
+        self.config_ids: frozenset[int] = frozenset(config_ids)
+        self.ids: frozenset[int] = self.config_ids
+        self.version: int = 0
+        self._task: Optional[asyncio.Task[None]] = None
+        self._refresh_lock = asyncio.Lock()
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _apply(self, ids: frozenset[int]) -> None:
+        if ids != self.ids:
+            self.ids = ids
+            self.version += 1
+            logger.info(f'[Sudoers] Registry updated to version {self.version} with {len(ids)} sudoers')
+
+    async def refresh(self) -> None:
+        async with self._refresh_lock:
+            documents = await Sudoers.get_motor_collection().find({}, {'user_id': 1, '_id': 0}).to_list(length=None)
+            self._apply(self.config_ids | {document['user_id'] for document in documents})
+
+    async def grant(self, user_id: int, added_by: Optional[int] = None) -> bool:
+        """Adds `user_id` to the sudoers collection; returns False if it already was a sudoer."""
+        if user_id in self.ids:
+            return False
+        await Sudoers.get_motor_collection().update_one(
+            {'user_id': user_id},
+            {'$setOnInsert': Sudoers(user_id=user_id, added_by=added_by).model_dump(exclude={'id', 'revision_id'})},
+            upsert=True,
+        )
+        sudoers_cache.invalidate(user_id)
+        self._apply(self.ids | {user_id})
+        return True
+
+    async def revoke(self, user_id: int) -> bool:
+        """Removes `user_id` from the sudoers collection; returns False if it wasn't a revocable sudoer."""
+        if user_id not in self.ids or user_id in self.config_ids:
+            return False
+        await Sudoers.get_motor_collection().delete_many({'user_id': user_id})
+        sudoers_cache.invalidate(user_id)
+        self._apply(self.ids - {user_id})
+        return True
+
+    async def _watch(self) -> None:
+        while True:
+            try:
+                async with Sudoers.get_motor_collection().watch() as stream:
+                    # Catch up on anything changed while no stream was open.
+                    await self.refresh()
+                    async for _ in stream:
+                        await self.refresh()
+            except PyMongoError as e:
+                if getattr(e, 'code', None) == 40573:  # change streams need a replica set
+                    logger.info('[Sudoers] Change streams unavailable, polling instead')
+                    return await self._poll()
+                logger.warning(f'[Sudoers] Change stream failed ({e}), reopening')
+                await asyncio.sleep(WATCH_RETRY_DELAY)
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except PyMongoError:
+                logger.exception('[Sudoers] Failed to refresh the registry')
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+sudoers = SudoersRegistry(load_sudoers())
+
+
+@on_startup
+async def start_sudoers_registry() -> None:
+    await sudoers.start()
+
+
+@on_shutdown
+async def stop_sudoers_registry() -> None:
+    await sudoers.stop()